@@ -0,0 +1,373 @@
+"""
+MEDICLASS: Sistema de Prontuário Eletrônico e Apoio à Decisão Clínica
+Parte do Trabalho Prático de ELE078
+
+Arquivo: arquivamento.py
+Autor: Matheus Marcondes <matheusmarcondes@ufmg.br>
+Data de criação: 2026-10-18
+Descrição:
+    Módulo responsável pela rotação dos históricos (historicos/<cpf>.txt): registros mais antigos
+    que uma idade configurável são movidos para segmentos comprimidos (gzip ou lzma) descritos em
+    um manifesto, mantendo apenas os registros recentes no arquivo "quente". A rotação só ocorre
+    quando há um lote mínimo de registros antigos, e segmentos pequenos consecutivos são compactados
+    em um só. Inclui a leitura transparente dos segmentos, a leitura do fim do histórico para trás
+    (fatia recente, exames pendentes, último registro) e a thread de manutenção em segundo plano.
+Repositório:
+Licença: MIT License
+Dependências:
+    os, json, gzip, lzma, threading, time, datetime
+"""
+
+import os
+import json
+import gzip
+import lzma
+import threading
+import time
+from datetime import datetime, timedelta
+
+HISTORICOS_DIR = 'historicos'
+ARQUIVO_DIR = os.path.join(HISTORICOS_DIR, 'arquivo')
+MANIFESTO_FILE = os.path.join(ARQUIVO_DIR, 'manifesto.json')
+LINHAS_CABECALHO = 3            # "Histórico de ...", "Criado em: ...", separador
+IDADE_MAX_DIAS = 90             # registros mais antigos que isso são arquivados
+INTERVALO_MANUTENCAO = 3600     # segundos entre execuções da manutenção
+LOTE_MINIMO_BYTES = 64 * 1024   # registros antigos acumulados antes de criar um segmento...
+IDADE_LOTE_DIAS = 30            # ...ou quando o mais antigo passou do limite há este tempo
+TAMANHO_SEGMENTO = 1024 * 1024  # segmentos consecutivos menores que isso (bytes originais) são compactados
+BLOCO_LEITURA = 8192            # leitura do fim do histórico para trás
+SOLICITACAO_EXAME = "Solicitação de exame enviada ao técnico."
+
+COMPRESSORES = {
+    'gzip': ('.gz', gzip.open),
+    'lzma': ('.xz', lzma.open),
+}
+
+# trava compartilhada entre gravação (Paciente.atualizar_historico), leitura e rotação dos históricos
+lock_historicos = threading.RLock()
+_manifesto: dict[str, list[dict]] | None = None
+
+
+def _carregar_manifesto() -> dict[str, list[dict]]:
+    global _manifesto
+    if _manifesto is None:
+        try:
+            with open(MANIFESTO_FILE, 'r', encoding='utf-8') as f:
+                _manifesto = json.load(f)
+        except FileNotFoundError:
+            _manifesto = {}
+    return _manifesto
+
+
+def _salvar_manifesto() -> None:
+    os.makedirs(ARQUIVO_DIR, exist_ok=True)
+    tmp = MANIFESTO_FILE + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(_manifesto, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, MANIFESTO_FILE)                    # troca atômica, o manifesto nunca fica parcial
+
+
+def segmentos(cpf: str) -> list[dict]:
+    with lock_historicos:
+        return list(_carregar_manifesto().get(cpf, []))
+
+
+def _ler_segmento(seg: dict) -> str:
+    _, abrir = COMPRESSORES[seg['compressao']]
+    with abrir(os.path.join(ARQUIVO_DIR, seg['arquivo']), 'rt', encoding='utf-8') as f:
+        return f.read()
+
+
+def _proximo_nome(cpf: str, segs: list[dict], sufixo: str) -> str:        # numeração crescente, sem reaproveitar nomes após compactação
+    ultimo = max((int(s['arquivo'][len(cpf) + 1:].split('.')[0]) for s in segs), default=0)
+    return f"{cpf}_{ultimo + 1:04d}.txt{sufixo}"
+
+
+def ler_arquivado(cpf: str) -> str:        # concatena os segmentos comprimidos do paciente, do mais antigo ao mais recente
+    return ''.join(_ler_segmento(seg) for seg in segmentos(cpf))
+
+
+def ler_historico(caminho: str, cpf: str) -> str:        # leitura transparente: cabeçalho + segmentos arquivados + registros quentes
+    with lock_historicos:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            quente = f.read()
+        if cpf not in _carregar_manifesto():
+            return quente
+        arquivado = ler_arquivado(cpf)
+    linhas = quente.splitlines(keepends=True)
+    return ''.join(linhas[:LINHAS_CABECALHO]) + arquivado + ''.join(linhas[LINHAS_CABECALHO:])
+
+
+def carregar_manifesto_de(historicos: str) -> dict[str, list[dict]]:        # manifesto de um diretório de históricos qualquer
+    try:
+        with open(os.path.join(historicos, 'arquivo', 'manifesto.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def ler_completo(historicos: str, cpf: str, manifesto: dict | None = None) -> str:
+    """
+    Mesma montagem de ler_historico para um diretório de históricos qualquer (fragmentos, ferramentas
+    de linha de comando), sem o manifesto em memória do diretório de trabalho. `manifesto` evita
+    recarregar o arquivo quando vários históricos do mesmo diretório são lidos.
+    """
+    if manifesto is None:
+        manifesto = carregar_manifesto_de(historicos)
+    with open(os.path.join(historicos, f"{cpf}.txt"), 'r', encoding='utf-8') as f:
+        linhas = f.read().splitlines(keepends=True)
+    partes = []
+    for seg in manifesto.get(cpf, []):
+        _, abrir = COMPRESSORES[seg['compressao']]
+        with abrir(os.path.join(historicos, 'arquivo', seg['arquivo']), 'rt', encoding='utf-8') as f:
+            partes.append(f.read())
+    return ''.join(linhas[:LINHAS_CABECALHO]) + ''.join(partes) + ''.join(linhas[LINHAS_CABECALHO:])
+
+
+def _registros_reversos(caminho: str):        # registros do histórico (linhas com timestamp), do último para o primeiro
+    with open(caminho, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        posicao = f.tell()
+        resto = b''
+        while posicao > 0:
+            tamanho = min(BLOCO_LEITURA, posicao)
+            posicao -= tamanho
+            f.seek(posicao)
+            partes = (f.read(tamanho) + resto).split(b'\n')
+            resto = partes.pop(0) if posicao > 0 else b''        # primeira linha do bloco pode estar incompleta
+            for bruta in reversed(partes):
+                linha = bruta.decode('utf-8', errors='replace')
+                if linha.startswith('[') and len(linha) > 21:
+                    yield linha
+
+
+def ler_fatia(caminho: str, inicio: datetime) -> list[str]:
+    """
+    Lê o histórico de trás para frente, em blocos, devolvendo apenas os registros com timestamp
+    a partir de `inicio` (em ordem cronológica).
+    """
+    limite = inicio.strftime('%Y-%m-%d %H:%M:%S')
+    linhas: list[str] = []
+    for linha in _registros_reversos(caminho):
+        if linha[1:20] < limite:                                 # timestamps ISO comparam como texto
+            break
+        linhas.append(linha)
+    return linhas[::-1]
+
+
+def exames_pendentes(caminho: str) -> int:
+    """
+    Solicitações de exame ainda sem resultado: as registradas depois do último resultado de exame,
+    lidas do fim do histórico (independe da janela do plantão).
+    """
+    pendentes = 0
+    for linha in _registros_reversos(caminho):
+        if linha[22:].startswith('Exame: '):
+            break
+        if linha.endswith(SOLICITACAO_EXAME):
+            pendentes += 1
+    return pendentes
+
+
+def ultimo_registro(caminho: str) -> str | None:        # timestamp (texto ISO) do registro mais recente do arquivo quente
+    return next((linha[1:20] for linha in _registros_reversos(caminho)), None)
+
+
+def reescrever_historico(caminho: str, cpf: str, texto: str) -> None:
+    """
+    Substitui o histórico completo (cabeçalho + todos os registros) pelo texto dado, descartando os
+    segmentos arquivados do paciente; a manutenção volta a arquivar os registros antigos.
+    """
+    with lock_historicos:
+        tmp = caminho + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(texto)
+        os.replace(tmp, caminho)
+        segs = _carregar_manifesto().pop(cpf, [])
+        if segs:
+            _salvar_manifesto()
+            for seg in segs:
+                try:
+                    os.remove(os.path.join(ARQUIVO_DIR, seg['arquivo']))
+                except FileNotFoundError:
+                    pass
+
+
+def _timestamp(linha: str) -> datetime | None:
+    if not linha.startswith('[') or len(linha) < 21:
+        return None
+    try:
+        return datetime.strptime(linha[1:20], '%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        return None
+
+
+def rotacionar(cpf: str, limite: datetime, compressao: str = 'gzip', lote_minimo: int = LOTE_MINIMO_BYTES) -> dict:
+    """
+    Move os registros anteriores a `limite` do histórico quente para um novo segmento comprimido,
+    desde que somem ao menos `lote_minimo` bytes ou o mais antigo tenha passado do limite há
+    IDADE_LOTE_DIAS (evita um segmento minúsculo por execução). Retorna um resumo com bytes
+    originais/comprimidos e número de linhas arquivadas.
+    """
+    caminho = os.path.join(HISTORICOS_DIR, f"{cpf}.txt")
+    sufixo, abrir = COMPRESSORES[compressao]
+    with lock_historicos:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            # verificação barata: se o primeiro registro já é recente, não há nada a arquivar
+            linhas = [f.readline() for _ in range(LINHAS_CABECALHO + 1)]
+            ts = _timestamp(linhas[-1])
+            if ts is None or ts >= limite:
+                return {'linhas': 0, 'bytes_originais': 0, 'bytes_comprimidos': 0}
+            linhas += f.readlines()
+        corpo = linhas[LINHAS_CABECALHO:]
+        corte = 0
+        for i, linha in enumerate(corpo):
+            ts = _timestamp(linha)
+            if ts is not None:
+                if ts >= limite:
+                    break
+                corte = i + 1
+            elif corte == i:                            # linha de continuação acompanha o registro anterior
+                corte = i + 1
+        if corte == 0:
+            return {'linhas': 0, 'bytes_originais': 0, 'bytes_comprimidos': 0}
+
+        antigos = ''.join(corpo[:corte])
+        bytes_orig = len(antigos.encode('utf-8'))
+        if bytes_orig < lote_minimo and _timestamp(corpo[0]) >= limite - timedelta(days=IDADE_LOTE_DIAS):
+            return {'linhas': 0, 'bytes_originais': 0, 'bytes_comprimidos': 0}
+        manifesto = _carregar_manifesto()
+        segs = manifesto.setdefault(cpf, [])
+        nome = _proximo_nome(cpf, segs, sufixo)
+        os.makedirs(ARQUIVO_DIR, exist_ok=True)
+        with abrir(os.path.join(ARQUIVO_DIR, nome), 'wt', encoding='utf-8') as f:
+            f.write(antigos)
+        bytes_comp = os.path.getsize(os.path.join(ARQUIVO_DIR, nome))
+        segs.append({
+            'arquivo': nome,
+            'compressao': compressao,
+            'inicio': corpo[0][1:20],
+            'fim': corpo[corte - 1][1:20],
+            'linhas': corte,
+            'bytes_originais': bytes_orig,
+            'bytes_comprimidos': bytes_comp,
+        })
+        _salvar_manifesto()
+
+        # reescreve o arquivo quente apenas com cabeçalho + registros recentes
+        tmp = caminho + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.writelines(linhas[:LINHAS_CABECALHO] + corpo[corte:])
+        os.replace(tmp, caminho)
+    return {'linhas': corte, 'bytes_originais': bytes_orig, 'bytes_comprimidos': bytes_comp}
+
+
+def compactar(cpf: str, compressao: str = 'gzip') -> dict:
+    """
+    Junta segmentos consecutivos do paciente enquanto a soma dos bytes originais couber em
+    TAMANHO_SEGMENTO, para que a leitura de pacientes crônicos não abra dezenas de arquivos
+    pequenos. Retorna o número de segmentos removidos e os bytes economizados.
+    """
+    sufixo, abrir = COMPRESSORES[compressao]
+    with lock_historicos:
+        manifesto = _carregar_manifesto()
+        segs = manifesto.get(cpf, [])
+        grupos: list[list[dict]] = []
+        for seg in segs:
+            if grupos and sum(s['bytes_originais'] for s in grupos[-1]) + seg['bytes_originais'] <= TAMANHO_SEGMENTO:
+                grupos[-1].append(seg)
+            else:
+                grupos.append([seg])
+        if len(grupos) == len(segs):
+            return {'removidos': 0, 'bytes_economizados': 0}
+        novos, substituidos = [], []
+        economia = 0
+        os.makedirs(ARQUIVO_DIR, exist_ok=True)
+        for grupo in grupos:
+            if len(grupo) == 1:
+                novos.append(grupo[0])
+                continue
+            nome = _proximo_nome(cpf, segs + novos, sufixo)
+            with abrir(os.path.join(ARQUIVO_DIR, nome), 'wt', encoding='utf-8') as f:
+                f.write(''.join(_ler_segmento(s) for s in grupo))
+            comprimidos = os.path.getsize(os.path.join(ARQUIVO_DIR, nome))
+            economia += sum(s['bytes_comprimidos'] for s in grupo) - comprimidos
+            novos.append({
+                'arquivo': nome,
+                'compressao': compressao,
+                'inicio': grupo[0]['inicio'],
+                'fim': grupo[-1]['fim'],
+                'linhas': sum(s['linhas'] for s in grupo),
+                'bytes_originais': sum(s['bytes_originais'] for s in grupo),
+                'bytes_comprimidos': comprimidos,
+            })
+            substituidos += grupo
+        manifesto[cpf] = novos
+        _salvar_manifesto()                             # manifesto aponta para os novos segmentos antes de remover os antigos
+        for seg in substituidos:
+            try:
+                os.remove(os.path.join(ARQUIVO_DIR, seg['arquivo']))
+            except FileNotFoundError:
+                pass
+    return {'removidos': len(segs) - len(novos), 'bytes_economizados': economia}
+
+
+def executar_manutencao(idade_max_dias: int = IDADE_MAX_DIAS, compressao: str = 'gzip') -> dict:
+    """
+    Percorre historicos/*.txt arquivando registros antigos. Retorna relatório com espaço
+    economizado e latência média de leitura do histórico completo (ler_historico, com a
+    descompressão dos segmentos) antes/depois da rotação.
+    """
+    limite = datetime.now() - timedelta(days=idade_max_dias)
+    relatorio = {'arquivos': 0, 'rotacionados': 0, 'linhas': 0, 'bytes_economizados': 0,
+                 'segmentos_compactados': 0, 'latencia_antes_ms': 0.0, 'latencia_depois_ms': 0.0}
+    if not os.path.isdir(HISTORICOS_DIR):
+        return relatorio
+    for nome in os.listdir(HISTORICOS_DIR):
+        if not nome.endswith('.txt'):
+            continue
+        cpf = nome[:-4]
+        caminho = os.path.join(HISTORICOS_DIR, nome)
+        relatorio['arquivos'] += 1
+        inicio = time.perf_counter()
+        ler_historico(caminho, cpf)
+        antes = time.perf_counter() - inicio
+        resumo = rotacionar(cpf, limite, compressao)
+        if len(segmentos(cpf)) > 1:
+            compactacao = compactar(cpf, compressao)
+            relatorio['segmentos_compactados'] += compactacao['removidos']
+            relatorio['bytes_economizados'] += compactacao['bytes_economizados']
+        if not resumo['linhas']:
+            continue
+        inicio = time.perf_counter()
+        ler_historico(caminho, cpf)
+        relatorio['latencia_antes_ms'] += antes * 1000
+        relatorio['latencia_depois_ms'] += (time.perf_counter() - inicio) * 1000
+        relatorio['rotacionados'] += 1
+        relatorio['linhas'] += resumo['linhas']
+        relatorio['bytes_economizados'] += resumo['bytes_originais'] - resumo['bytes_comprimidos']
+    if relatorio['rotacionados']:
+        relatorio['latencia_antes_ms'] /= relatorio['rotacionados']
+        relatorio['latencia_depois_ms'] /= relatorio['rotacionados']
+    return relatorio
+
+
+class ManutencaoHistoricos(threading.Thread):        # job em segundo plano que executa a rotação periodicamente
+
+    def __init__(self, idade_max_dias: int = IDADE_MAX_DIAS, compressao: str = 'gzip',
+                 intervalo: float = INTERVALO_MANUTENCAO):
+        super().__init__(name='manutencao-historicos', daemon=True)
+        self.idade_max_dias = idade_max_dias
+        self.compressao = compressao
+        self.intervalo = intervalo
+        self.ultimo_relatorio: dict | None = None
+        self._parar = threading.Event()
+
+    def run(self) -> None:
+        while not self._parar.is_set():
+            self.ultimo_relatorio = executar_manutencao(self.idade_max_dias, self.compressao)
+            self._parar.wait(self.intervalo)
+
+    def parar(self) -> None:
+        self._parar.set()
+        self.join()
@@ -0,0 +1,221 @@
+"""
+MEDICLASS: Sistema de Prontuário Eletrônico e Apoio à Decisão Clínica
+Parte do Trabalho Prático de ELE078
+
+Arquivo: auditoria.py
+Autor: Matheus Marcondes <matheusmarcondes@ufmg.br>
+Data de criação: 2026-10-18
+Descrição:
+    Módulo responsável pela classe TrilhaAuditoria, que registra cada leitura e alteração de
+    prontuário (login, função, CPF, operação, instante) em um buffer em memória. Uma thread em
+    segundo plano grava os registros em lotes em um log somente-anexação, encadeado por hash
+    (SHA-256) para evidenciar adulterações. Executar `python auditoria.py` consulta o log.
+Repositório:
+Licença: MIT License
+Dependências:
+    os, sys, json, time, hashlib, atexit, argparse, threading, collections, datetime
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import atexit
+import argparse
+import threading
+from collections import deque
+from datetime import datetime
+
+AUDITORIA_FILE = 'auditoria.log'
+CAPACIDADE_BUFFER = 10000       # a cada múltiplo disso o próprio chamador esvazia o buffer (nenhum registro é descartado)
+INTERVALO_GRAVACAO = 1.0        # segundos entre gravações em lote
+HASH_INICIAL = '0' * 64
+
+
+def _hash(anterior: str, campos: dict) -> str:
+    conteudo = anterior + json.dumps(campos, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+
+def _ultimo_hash(caminho: str) -> tuple[str, bool]:
+    """
+    Lê o fim do arquivo, de trás para frente, até o último registro íntegro para continuar a cadeia.
+    Retorna o hash desse registro e se o arquivo termina em uma linha completa: uma linha final
+    truncada (queda durante a gravação) é ignorada e continua acusada por verificar().
+    """
+    try:
+        with open(caminho, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            fim = f.tell()
+            tamanho = 4096
+            while True:
+                inicio = max(fim - tamanho, 0)
+                f.seek(inicio)
+                bloco = f.read()
+                linhas = bloco.split(b'\n')
+                if inicio > 0:
+                    linhas.pop(0)                                   # primeira linha do bloco pode estar incompleta
+                for linha in reversed(linhas):
+                    try:
+                        return json.loads(linha)['hash'], bloco.endswith(b'\n')
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                if inicio == 0:
+                    return HASH_INICIAL, not bloco or bloco.endswith(b'\n')
+                tamanho *= 2
+    except FileNotFoundError:
+        return HASH_INICIAL, True
+
+
+class IdentidadeSistema:        # autor dos registros feitos por processos automáticos, sem login humano
+
+    def __init__(self, login: str):
+        self.login = login
+
+
+class TrilhaAuditoria:        # buffer de eventos de acesso + gravação assíncrona encadeada
+
+    def __init__(self, caminho: str = AUDITORIA_FILE, intervalo: float = INTERVALO_GRAVACAO):
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self._buffer: deque = deque()
+        self._lock_gravacao = threading.Lock()
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._hash_anterior: str | None = None
+        self._linha_truncada = False        # arquivo termina sem quebra de linha: o próximo registro começa em nova linha
+        self._em_falha = False              # falha de gravação já reportada (avisa uma vez até a gravação voltar)
+
+    def registrar(self, usuario, cpf: str, operacao: str) -> None:
+        # caminho crítico: apenas uma tupla anexada ao deque (operação atômica, sem E/S)
+        self._buffer.append((time.time(), usuario.login, usuario.__class__.__name__, cpf, operacao))
+        if len(self._buffer) % CAPACIDADE_BUFFER == 0:
+            try:
+                self.gravar()
+            except OSError as erro:        # nunca interrompe a operação clínica: os registros continuam no buffer
+                self._reportar(erro)
+
+    def _reportar(self, erro: OSError) -> None:
+        if not self._em_falha:
+            self._em_falha = True
+            print(f"\n[auditoria] falha ao gravar {self.caminho}: {erro} "
+                  f"({len(self._buffer)} registro(s) mantidos em memória até a próxima gravação)")
+
+    def gravar(self) -> int:        # esvazia o buffer no log, retorna quantos registros foram gravados
+        with self._lock_gravacao:
+            if self._hash_anterior is None:
+                self._hash_anterior, completo = _ultimo_hash(self.caminho)
+                self._linha_truncada = not completo
+            hash_inicial = self._hash_anterior
+            registros = []
+            while self._buffer:
+                registros.append(self._buffer.popleft())
+            linhas = ['\n'] if registros and self._linha_truncada else []
+            for instante, login, papel, cpf, operacao in registros:
+                campos = {
+                    'instante': datetime.fromtimestamp(instante).isoformat(timespec='microseconds'),
+                    'login': login,
+                    'papel': papel,
+                    'cpf': cpf,
+                    'operacao': operacao,
+                    'anterior': self._hash_anterior,
+                }
+                campos['hash'] = self._hash_anterior = _hash(self._hash_anterior, campos)
+                linhas.append(json.dumps(campos, ensure_ascii=False) + '\n')
+            if registros:
+                try:
+                    with open(self.caminho, 'a', encoding='utf-8') as f:
+                        f.writelines(linhas)
+                        f.flush()
+                        os.fsync(f.fileno())
+                except OSError:
+                    self._buffer.extendleft(reversed(registros))        # nada se perde: nova tentativa na próxima gravação
+                    self._hash_anterior = hash_inicial
+                    raise
+                self._linha_truncada = False
+                if self._em_falha:
+                    self._em_falha = False
+                    print(f"\n[auditoria] gravação restabelecida: {len(registros)} registro(s) pendente(s) gravado(s).")
+            return len(registros)
+
+    def _executar(self) -> None:
+        while not self._parar.is_set():
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            try:
+                self.gravar()
+            except OSError as erro:                                # a thread continua; os registros ficam no buffer
+                self._reportar(erro)
+
+    def iniciar(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name='auditoria', daemon=True)
+            self._thread.start()
+            atexit.register(self.encerrar)                    # garante a gravação mesmo sem encerrar() explícito
+
+    def encerrar(self) -> None:
+        if self._thread is not None:
+            self._parar.set()
+            self._acordar.set()
+            self._thread.join()
+            self._thread = None
+        self.gravar()
+
+
+def consultar(caminho: str = AUDITORIA_FILE, login: str | None = None, cpf: str | None = None) -> list[dict]:
+    resultados = []
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:                              # linha truncada por queda durante a gravação
+                    continue
+                if (login is None or registro['login'] == login) and (cpf is None or registro['cpf'] == cpf):
+                    resultados.append(registro)
+    except FileNotFoundError:
+        pass
+    return resultados
+
+
+def verificar(caminho: str = AUDITORIA_FILE) -> int | None:
+    """
+    Recalcula a cadeia de hashes. Retorna None se íntegra ou o número (1-based) da primeira
+    linha adulterada. Linhas truncadas (JSON incompleto) nunca entram na cadeia e são ignoradas:
+    a remoção de qualquer registro gravado continua quebrando o encadeamento do seguinte.
+    """
+    anterior = HASH_INICIAL
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            for n, linha in enumerate(f, 1):
+                try:
+                    campos = json.loads(linha)
+                except ValueError:
+                    continue
+                try:
+                    registrado = campos.pop('hash')
+                except (KeyError, AttributeError):
+                    return n
+                if campos.get('anterior') != anterior or _hash(anterior, campos) != registrado:
+                    return n
+                anterior = registrado
+    except FileNotFoundError:
+        pass
+    return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta a trilha de auditoria do Mediclass.")
+    parser.add_argument('--login', help="filtra pelo login do profissional")
+    parser.add_argument('--cpf', help="filtra pelo CPF do paciente")
+    parser.add_argument('--arquivo', default=AUDITORIA_FILE)
+    parser.add_argument('--verificar', action='store_true', help="verifica a integridade da cadeia de hashes")
+    args = parser.parse_args()
+    if args.verificar:
+        linha = verificar(args.arquivo)
+        print("Trilha íntegra." if linha is None else f"Trilha adulterada a partir da linha {linha}.")
+        sys.exit(0 if linha is None else 1)
+    for reg in consultar(args.arquivo, args.login, args.cpf):
+        print(f"{reg['instante']} | {reg['login']} ({reg['papel']}) | CPF {reg['cpf']} | {reg['operacao']}")
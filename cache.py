@@ -0,0 +1,95 @@
+"""
+MEDICLASS: Sistema de Prontuário Eletrônico e Apoio à Decisão Clínica
+Parte do Trabalho Prático de ELE078
+
+Arquivo: cache.py
+Autor: Matheus Marcondes <matheusmarcondes@ufmg.br>
+Data de criação: 2026-10-18
+Descrição:
+    Módulo responsável pela classe CacheLRU, um cache LRU limitado em bytes usado para manter em
+    memória os históricos e os prontuários renderizados mais acessados. O histórico é atualizado
+    por escrita direta (write-through) em Paciente.atualizar_historico, nunca ficando desatualizado.
+Repositório:
+Licença: MIT License
+Dependências:
+    sys, threading, collections
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+CAPACIDADE_CACHE = 64 * 1024 * 1024        # 64 MiB para históricos + prontuários renderizados
+
+
+class CacheLRU:        # cache LRU com limite em bytes e estatísticas de acertos/falhas/remoções
+
+    def __init__(self, capacidade_bytes: int = CAPACIDADE_CACHE):
+        self.capacidade_bytes = capacidade_bytes
+        self.bytes_usados = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+        self._itens: OrderedDict = OrderedDict()        # chave -> (valor, tamanho), do menos ao mais recente
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _tamanho(valor) -> int:
+        if isinstance(valor, tuple):
+            return sum(sys.getsizeof(v) for v in valor)
+        return sys.getsizeof(valor)
+
+    def obter(self, chave):
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return item[0]
+
+    def guardar(self, chave, valor) -> None:
+        with self._lock:
+            self._guardar(chave, valor)
+
+    def _guardar(self, chave, valor) -> None:        # chamada com self._lock já adquirido
+        tamanho = self._tamanho(valor)
+        antigo = self._itens.pop(chave, None)
+        if antigo is not None:
+            self.bytes_usados -= antigo[1]
+        if tamanho > self.capacidade_bytes:                # item maior que o cache inteiro não é guardado
+            return
+        self._itens[chave] = (valor, tamanho)
+        self.bytes_usados += tamanho
+        while self.bytes_usados > self.capacidade_bytes:
+            _, (_, removido) = self._itens.popitem(last=False)
+            self.bytes_usados -= removido
+            self.remocoes += 1
+
+    def anexar(self, chave, sufixo: str) -> None:        # write-through: estende o texto em cache apenas se já estiver presente
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._guardar(chave, item[0] + sufixo)
+
+    def invalidar(self, chave) -> None:
+        with self._lock:
+            item = self._itens.pop(chave, None)
+            if item is not None:
+                self.bytes_usados -= item[1]
+
+    def estatisticas(self) -> dict:
+        total = self.acertos + self.falhas
+        return {
+            'itens': len(self._itens),
+            'bytes_usados': self.bytes_usados,
+            'capacidade_bytes': self.capacidade_bytes,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'remocoes': self.remocoes,
+            'taxa_acerto': self.acertos / total if total else 0.0,
+        }
+
+
+cache_prontuarios = CacheLRU()        # instância compartilhada por Paciente e SistemaMediclass
@@ -0,0 +1,154 @@
+"""
+MEDICLASS: Sistema de Prontuário Eletrônico e Apoio à Decisão Clínica
+Parte do Trabalho Prático de ELE078
+
+Arquivo: duplicados.py
+Autor: Matheus Marcondes <matheusmarcondes@ufmg.br>
+Data de criação: 2026-10-18
+Descrição:
+    Módulo responsável pela detecção de cadastros duplicados (ex.: CPF digitado errado). Um índice
+    de blocagem por data de nascimento + chave fonética de cada token do nome (regras simplificadas
+    para o português) restringe a comparação a poucos candidatos, pontuados por similaridade de
+    texto. Inclui a varredura em lote e a mesclagem de históricos.
+Repositório:
+Licença: MIT License
+Dependências:
+    os, re, unicodedata, difflib, datetime, arquivamento, cache
+"""
+
+import os
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from datetime import date
+
+import arquivamento
+from cache import cache_prontuarios
+
+LIMIAR_SIMILARIDADE = 0.85
+PARTICULAS = {'da', 'de', 'do', 'das', 'dos', 'e'}
+
+# regras fonéticas aplicadas em ordem sobre o nome sem acentos (dígrafos antes das letras isoladas)
+_REGRAS_FONETICAS = [
+    (re.compile(r'ph'), 'f'),
+    (re.compile(r'lh'), 'l'),
+    (re.compile(r'nh'), 'n'),
+    (re.compile(r'[cs]h'), 'x'),
+    (re.compile(r'sc(?=[ei])'), 's'),
+    (re.compile(r'c(?=[ei])'), 's'),
+    (re.compile(r'qu?|ck|c'), 'k'),
+    (re.compile(r'g(?=[ei])'), 'j'),
+    (re.compile(r'gu(?=[ei])'), 'g'),
+    (re.compile(r'y'), 'i'),
+    (re.compile(r'w'), 'v'),
+    (re.compile(r'z'), 's'),
+    (re.compile(r'h'), ''),
+    (re.compile(r'm(?=[^aeiou]|$)'), 'n'),          # "m" antes de consoante/final soa como "n" (ex.: Bomfim/Bonfim)
+    (re.compile(r'(.)\1+'), r'\1'),                  # letras repetidas (ss, rr, ll...)
+]
+
+
+def sem_acentos(texto: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c))
+
+
+def normalizar_nome(nome: str) -> list[str]:        # tokens do nome sem acentos, minúsculos e sem partículas
+    tokens = re.findall(r'[a-z]+', sem_acentos(nome).casefold())
+    return [t for t in tokens if t not in PARTICULAS]
+
+
+def chave_fonetica(token: str) -> str:
+    for padrao, troca in _REGRAS_FONETICAS:
+        token = padrao.sub(troca, token)
+    if not token:
+        return ''
+    # mantém a primeira letra e o esqueleto de consoantes (vogais variam muito na digitação)
+    return token[0] + re.sub(r'[aeiou]', '', token[1:])
+
+
+def similaridade(nome_a: str, nome_b: str) -> float:
+    return SequenceMatcher(None, ' '.join(normalizar_nome(nome_a)), ' '.join(normalizar_nome(nome_b))).ratio()
+
+
+class IndiceDuplicados:        # índice de blocagem (data de nascimento, chave fonética) -> CPFs
+
+    def __init__(self):
+        self._blocos: dict[tuple[str, str], set[str]] = {}
+        self._chaves: dict[str, list[tuple[str, str]]] = {}        # CPF -> chaves em que aparece
+        self._nomes: dict[str, str] = {}
+
+    @staticmethod
+    def chaves(nome: str, data_nascimento: date) -> list[tuple[str, str]]:
+        data = data_nascimento.isoformat()
+        tokens = normalizar_nome(nome)
+        # primeiro e último nome bastam para separar blocos sem perder erros de digitação no meio
+        return sorted({(data, chave_fonetica(t)) for t in (tokens[:1] + tokens[-1:]) if chave_fonetica(t)})
+
+    def adicionar(self, paciente) -> None:
+        self.remover(paciente.cpf)
+        chaves = self.chaves(paciente.nome, paciente.data_nascimento)
+        for chave in chaves:
+            self._blocos.setdefault(chave, set()).add(paciente.cpf)
+        self._chaves[paciente.cpf] = chaves
+        self._nomes[paciente.cpf] = paciente.nome
+
+    def remover(self, cpf: str) -> None:
+        for chave in self._chaves.pop(cpf, []):
+            bloco = self._blocos.get(chave)
+            if bloco:
+                bloco.discard(cpf)
+                if not bloco:
+                    del self._blocos[chave]
+        self._nomes.pop(cpf, None)
+
+    def candidatos(self, nome: str, data_nascimento: date, excluir_cpf: str | None = None) -> list[tuple[str, float]]:
+        # apenas os CPFs que compartilham algum bloco são comparados
+        cpfs = set()
+        for chave in self.chaves(nome, data_nascimento):
+            cpfs |= self._blocos.get(chave, set())
+        cpfs.discard(excluir_cpf)
+        pontuados = [(cpf, similaridade(nome, self._nomes[cpf])) for cpf in cpfs]
+        return sorted((c for c in pontuados if c[1] >= LIMIAR_SIMILARIDADE), key=lambda c: -c[1])
+
+    def varrer(self) -> list[tuple[str, str, float]]:        # varredura em lote: compara pares apenas dentro de cada bloco
+        pares: dict[tuple[str, str], float] = {}
+        for bloco in self._blocos.values():
+            if len(bloco) < 2:
+                continue
+            membros = sorted(bloco)
+            for i, a in enumerate(membros):
+                for b in membros[i + 1:]:
+                    if (a, b) not in pares:
+                        pares[(a, b)] = similaridade(self._nomes[a], self._nomes[b])
+        return sorted(((a, b, s) for (a, b), s in pares.items() if s >= LIMIAR_SIMILARIDADE), key=lambda p: -p[2])
+
+
+def _registros(texto: str) -> list[str]:        # registros do corpo do histórico, com linhas de continuação agrupadas
+    registros: list[str] = []
+    for linha in texto.splitlines(keepends=True)[arquivamento.LINHAS_CABECALHO:]:
+        if not linha.endswith('\n'):
+            linha += '\n'
+        if linha.startswith('[') or not registros:
+            registros.append(linha)
+        else:
+            registros[-1] += linha
+    return registros
+
+
+def mesclar_historicos(principal, duplicado) -> None:
+    """
+    Intercala por timestamp os registros do duplicado (incluindo segmentos arquivados) com os do
+    principal, reescreve o histórico do principal em ordem cronológica (a leitura de trás para
+    frente de passagem_plantao depende disso) e renomeia o arquivo do duplicado para <cpf>.txt.mesclado.
+    """
+    with arquivamento.lock_historicos:
+        texto = principal.consultar_historico()
+        cabecalho = ''.join(texto.splitlines(keepends=True)[:arquivamento.LINHAS_CABECALHO])
+        # sorted é estável: no mesmo segundo, os registros do principal vêm primeiro
+        registros = sorted(_registros(texto) + _registros(duplicado.consultar_historico()),
+                           key=lambda r: r[1:20] if r.startswith('[') else '')
+        arquivamento.reescrever_historico(principal._historico_file, principal.cpf, cabecalho + ''.join(registros))
+        cache_prontuarios.invalidar(('historico', principal.cpf))
+        cache_prontuarios.invalidar(('historico', duplicado.cpf))
+        os.replace(duplicado._historico_file, duplicado._historico_file + '.mesclado')
+        principal.atualizar_historico(f"Mesclagem: registros do cadastro duplicado CPF {duplicado.cpf} incorporados em ordem cronológica.")
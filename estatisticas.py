@@ -0,0 +1,151 @@
+"""
+MEDICLASS: Sistema de Prontuário Eletrônico e Apoio à Decisão Clínica
+Parte do Trabalho Prático de ELE078
+
+Arquivo: estatisticas.py
+Autor: Matheus Marcondes <matheusmarcondes@ufmg.br>
+Data de criação: 2026-10-18
+Descrição:
+    Módulo responsável pela classe EstatisticasMediclass, que mantém contadores agregados
+    (censo da enfermaria, triagens por TipoSintoma, diagnósticos e exames) e baldes por hora,
+    atualizados em O(1) a cada evento, sem percorrer pacientes ou arquivos de histórico.
+Repositório:
+Licença: MIT License
+Dependências:
+    collections, datetime
+"""
+
+from collections import Counter
+from datetime import datetime
+
+HORAS_MANTIDAS = 72        # quantidade de baldes por hora mantidos (janela deslizante)
+
+
+class EstatisticasMediclass:        # contadores incrementais do sistema, alimentados pelos eventos do SistemaMediclass
+
+    EVENTOS = ('entrada', 'triagem', 'prioridade', 'diagnostico', 'exame')
+
+    def __init__(self):
+        self.totais: Counter = Counter()                 # total acumulado por tipo de evento
+        self.triagens_por_sintoma: Counter = Counter()   # chave: TipoSintoma.value
+        self.diagnosticos_por_categoria: Counter = Counter()
+        self.exames_por_tipo: Counter = Counter()        # chave: ExamType.value
+        self.por_hora: dict[str, Counter] = {}           # 'YYYY-MM-DD HH' -> contagem de eventos naquela hora
+        self.internados: set[str] = set()                # CPFs com entrada registrada (com leito ou aguardando leito)
+        self.prioritarios: set[str] = set()              # CPFs com flag de prioridade ativa
+
+    # ---- registro de eventos (todos O(1)) ----
+
+    def _registrar(self, evento: str, quando: datetime | None = None) -> None:
+        self.totais[evento] += 1
+        chave = (quando or datetime.now()).strftime('%Y-%m-%d %H')
+        balde = self.por_hora.get(chave)
+        if balde is None:
+            balde = self.por_hora[chave] = Counter()
+            if len(self.por_hora) > HORAS_MANTIDAS:      # baldes são inseridos em ordem cronológica, o mais antigo é o primeiro
+                del self.por_hora[next(iter(self.por_hora))]
+        balde[evento] += 1
+
+    def registrar_entrada(self, cpf: str) -> None:
+        self.internados.add(cpf)
+        self._registrar('entrada')
+
+    def registrar_alta(self, cpf: str) -> None:
+        self.internados.discard(cpf)
+        self.prioritarios.discard(cpf)
+
+    def registrar_triagem(self, tipo_sintoma: str) -> None:
+        self.triagens_por_sintoma[tipo_sintoma] += 1
+        self._registrar('triagem')
+
+    def registrar_prioridade(self, cpf: str, ativa: bool = True) -> None:
+        if ativa:
+            if cpf not in self.prioritarios:
+                self.prioritarios.add(cpf)
+                self._registrar('prioridade')
+        else:
+            self.prioritarios.discard(cpf)
+
+    def registrar_diagnostico(self, categoria: str) -> None:
+        self.diagnosticos_por_categoria[categoria] += 1
+        self._registrar('diagnostico')
+
+    def registrar_exame(self, exame: str) -> None:
+        self.exames_por_tipo[exame] += 1
+        self._registrar('exame')
+
+    # ---- consultas ----
+
+    def censo(self, leitos=None) -> dict:
+        # visão agregada para o painel/integrações, custo independente do número de pacientes;
+        # leitos ocupados vêm do RegistroLeitos (None sem mapa de leitos configurado)
+        ocupados = None
+        if leitos is not None and leitos.configurado:
+            ocupados = sum(info['ocupados'] for info in leitos.resumo().values())
+        return {
+            'internados': len(self.internados),
+            'leitos_ocupados': ocupados,
+            'prioritarios': len(self.prioritarios),
+            'totais': dict(self.totais),
+            'triagens_por_sintoma': dict(self.triagens_por_sintoma),
+            'diagnosticos_por_categoria': dict(self.diagnosticos_por_categoria),
+            'exames_por_tipo': dict(self.exames_por_tipo),
+        }
+
+    def ultimas_horas(self, horas: int = 24) -> dict[str, dict[str, int]]:
+        chaves = list(self.por_hora)[-horas:]
+        return {k: dict(self.por_hora[k]) for k in chaves}
+
+    def painel(self, leitos=None) -> str:        # texto do painel de censo exibido no menu
+        c = self.censo(leitos)
+        linhas = [
+            "=== Painel da Enfermaria ===",
+            f"Pacientes internados: {c['internados']}",
+            f"Leitos ocupados: {c['leitos_ocupados'] if c['leitos_ocupados'] is not None else '(mapa de leitos não configurado)'}",
+            f"Pacientes prioritários: {c['prioritarios']}",
+            "\n--- Totais de eventos ---",
+        ]
+        linhas += [f"{e}: {c['totais'].get(e, 0)}" for e in self.EVENTOS]
+        linhas.append("\n--- Triagens por tipo de sintoma ---")
+        linhas += [f"{k}: {v}" for k, v in self.triagens_por_sintoma.most_common()] or ["(nenhuma)"]
+        linhas.append("\n--- Diagnósticos sugeridos por categoria ---")
+        linhas += [f"{k}: {v}" for k, v in self.diagnosticos_por_categoria.most_common()] or ["(nenhum)"]
+        linhas.append("\n--- Exames por tipo ---")
+        linhas += [f"{k}: {v}" for k, v in self.exames_por_tipo.most_common()] or ["(nenhum)"]
+        linhas.append("\n--- Últimas horas ---")
+        for hora, cont in self.ultimas_horas(12).items():
+            linhas.append(f"{hora}h: " + ", ".join(f"{e}={n}" for e, n in cont.items()))
+        return "\n".join(linhas)
+
+    # ---- persistência (incluída no mediclass_data.json) ----
+
+    def to_dict(self) -> dict:
+        return {
+            'totais': dict(self.totais),
+            'triagens_por_sintoma': dict(self.triagens_por_sintoma),
+            'diagnosticos_por_categoria': dict(self.diagnosticos_por_categoria),
+            'exames_por_tipo': dict(self.exames_por_tipo),
+            'por_hora': {k: dict(v) for k, v in self.por_hora.items()},
+            'internados': sorted(self.internados),
+            'prioritarios': sorted(self.prioritarios),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'EstatisticasMediclass':
+        est = cls()
+        est.totais.update(data.get('totais', {}))
+        est.triagens_por_sintoma.update(data.get('triagens_por_sintoma', {}))
+        est.diagnosticos_por_categoria.update(data.get('diagnosticos_por_categoria', {}))
+        est.exames_por_tipo.update(data.get('exames_por_tipo', {}))
+        for hora in sorted(data.get('por_hora', {})):
+            est.por_hora[hora] = Counter(data['por_hora'][hora])
+        est.internados.update(data.get('internados', []))
+        est.prioritarios.update(data.get('prioritarios', []))
+        return est
+
+    def reconstruir(self, pacientes: dict) -> None:        # passada única usada apenas quando não há estatísticas persistidas
+        for cpf, paciente in pacientes.items():
+            if paciente.leito or getattr(paciente, 'data_entrada', None):     # só quem ocupa leito ou tem entrada registrada
+                self.internados.add(cpf)
+            if paciente.prioritario:
+                self.prioritarios.add(cpf)
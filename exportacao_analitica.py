@@ -0,0 +1,222 @@
+"""
+MEDICLASS: Sistema de Prontuário Eletrônico e Apoio à Decisão Clínica
+Parte do Trabalho Prático de ELE078
+
+Arquivo: exportacao_analitica.py
+Autor: Matheus Marcondes <matheusmarcondes@ufmg.br>
+Data de criação: 2026-10-18
+Descrição:
+    Exportação do dataset analítico (pacientes, triagens, diagnósticos sugeridos e exames) em
+    tabelas planas particionadas: CSV ou JSON Lines e, se a biblioteca pyarrow estiver instalada,
+    Parquet. Os dados são percorridos em uma única passada, com memória limitada ao tamanho de uma
+    partição; exportações incrementais emitem apenas registros alterados desde a execução anterior.
+    Triagens, diagnósticos e exames vêm dos históricos; pela linha de comando, históricos de pacientes
+    ainda ausentes do mediclass_data.json também são lidos, para que nada fique para trás da marca
+    de execução. Indisponível no modo fragmentado.
+    Uso: python exportacao_analitica.py [--formato csv|jsonl|parquet] [--completa]
+Repositório:
+Licença: MIT License
+Dependências:
+    os, sys, ast, csv, json, argparse, datetime, arquivamento
+    opcional: pyarrow (formato parquet)
+"""
+
+import os
+import sys
+import ast
+import csv
+import json
+import argparse
+from datetime import datetime
+
+import arquivamento
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+EXPORTACAO_DIR = 'exportacao'
+ESTADO_FILE = 'estado.json'
+LINHAS_POR_PARTICAO = 50000
+FORMATOS = ('csv', 'jsonl', 'parquet')
+
+TABELAS = {
+    'pacientes': ('cpf', 'data_nascimento', 'convenio', 'leito', 'prioritario', 'data_entrada'),
+    'triagens': ('cpf', 'instante', 'frequencia_cardiaca', 'pressao_sistolica', 'pressao_diastolica',
+                 'saturacao_o2', 'tipo_sintoma', 'respostas_sim_nao'),
+    'diagnosticos': ('cpf', 'instante', 'categoria', 'descricao', 'exames_sugeridos'),
+    'exames': ('cpf', 'instante', 'exame', 'resultado'),
+}
+
+
+class EscritorParticionado:        # acumula até LINHAS_POR_PARTICAO linhas e grava cada partição em um arquivo próprio
+
+    def __init__(self, diretorio: str, tabela: str, formato: str, execucao: str):
+        self.diretorio = os.path.join(diretorio, tabela)
+        self.colunas = TABELAS[tabela]
+        self.formato = formato
+        self.execucao = execucao
+        self.particoes = 0
+        self.linhas = 0
+        self._buffer: list[dict] = []
+
+    def escrever(self, linha: dict) -> None:
+        self._buffer.append(linha)
+        if len(self._buffer) >= LINHAS_POR_PARTICAO:
+            self.descarregar()
+
+    def descarregar(self) -> None:
+        if not self._buffer:
+            return
+        os.makedirs(self.diretorio, exist_ok=True)
+        nome = os.path.join(self.diretorio, f"parte-{self.execucao}-{self.particoes:05d}.{self.formato}")
+        if self.formato == 'parquet':
+            colunas = {c: [linha.get(c) for linha in self._buffer] for c in self.colunas}
+            pyarrow.parquet.write_table(pyarrow.table(colunas), nome)
+        elif self.formato == 'jsonl':
+            with open(nome, 'w', encoding='utf-8') as f:
+                for linha in self._buffer:
+                    f.write(json.dumps(linha, ensure_ascii=False, default=str) + '\n')
+        else:
+            with open(nome, 'w', encoding='utf-8', newline='') as f:
+                escritor = csv.DictWriter(f, fieldnames=self.colunas)
+                escritor.writeheader()
+                escritor.writerows(self._buffer)
+        self.linhas += len(self._buffer)
+        self.particoes += 1
+        self._buffer.clear()
+
+
+def _registros_historico(paciente, desde: datetime | None):
+    # triagens e exames lidos do histórico: completo (com segmentos arquivados) ou apenas a fatia nova
+    caminho = getattr(paciente, '_historico_file', None)
+    if not caminho:
+        return
+    if desde is None:
+        linhas = arquivamento.ler_historico(caminho, paciente.cpf).splitlines()
+    else:
+        linhas = arquivamento.ler_fatia(caminho, desde)
+    for linha in linhas:
+        if not linha.startswith('[') or len(linha) < 22:
+            continue
+        instante, registro = linha[1:20], linha[22:]
+        if registro.startswith('Triagem: '):
+            try:
+                dados = ast.literal_eval(registro[len('Triagem: '):])
+                pas, _, pad = str(dados['pressao_arterial']).partition('/')
+                yield 'triagens', {
+                    'cpf': paciente.cpf, 'instante': dados.get('timestamp', instante),
+                    'frequencia_cardiaca': dados['frequencia_cardiaca'],
+                    'pressao_sistolica': int(pas), 'pressao_diastolica': int(pad),
+                    'saturacao_o2': dados['saturacao_o2'], 'tipo_sintoma': dados['tipo_sintoma'],
+                    'respostas_sim_nao': json.dumps(dados.get('respostas_sim_nao', {}), ensure_ascii=False),
+                }
+            except (ValueError, SyntaxError, KeyError):
+                continue
+        elif registro.startswith('Exame: '):
+            exame, _, resultado = registro[len('Exame: '):].partition(' | Resultado: ')
+            yield 'exames', {'cpf': paciente.cpf, 'instante': instante, 'exame': exame, 'resultado': resultado}
+        elif registro.startswith('Diagnóstico sugerido: '):
+            # formato: "Diagnóstico sugerido: categoria | descrição | Exames sugeridos: a; b"
+            categoria, _, resto = registro[len('Diagnóstico sugerido: '):].partition(' | ')
+            descricao, _, exames = resto.rpartition(' | Exames sugeridos: ')
+            yield 'diagnosticos', {'cpf': paciente.cpf, 'instante': instante, 'categoria': categoria,
+                                   'descricao': descricao, 'exames_sugeridos': exames}
+
+
+def _alterado_desde(paciente, desde: datetime | None) -> bool:        # pelo último registro: a rotação reescreve o arquivo
+    if desde is None:
+        return True
+    caminho = getattr(paciente, '_historico_file', None)
+    if not caminho:
+        return True
+    ultimo = arquivamento.ultimo_registro(caminho)
+    return ultimo is not None and ultimo >= desde.strftime('%Y-%m-%d %H:%M:%S')
+
+
+class _HistoricoAvulso:        # histórico em disco de um paciente ausente do JSON (cadastrado depois do último salvamento)
+
+    def __init__(self, caminho: str):
+        self.cpf = os.path.basename(caminho)[:-4]
+        self._historico_file = caminho
+
+
+def exportar(pacientes, diretorio: str = EXPORTACAO_DIR, formato: str = 'csv', incremental: bool = True,
+             historicos: str | None = None) -> dict:
+    """
+    Exporta as quatro tabelas em uma única passada pelos pacientes. Com `incremental`, apenas
+    pacientes e registros alterados desde a última execução (ver estado.json) são emitidos.
+    Com `historicos`, os arquivos desse diretório sem paciente correspondente também são lidos
+    (a marca de execução só avança sobre dados efetivamente lidos). Retorna o número de linhas por tabela.
+    """
+    if formato == 'parquet' and pyarrow is None:
+        raise RuntimeError("Formato parquet requer a biblioteca pyarrow (pip install pyarrow).")
+    if getattr(pacientes, 'roteador', None):
+        raise RuntimeError("Exportação analítica indisponível no modo fragmentado (históricos ficam nos processos trabalhadores).")
+    caminho_estado = os.path.join(diretorio, ESTADO_FILE)
+    desde = None
+    if incremental:
+        try:
+            with open(caminho_estado, 'r', encoding='utf-8') as f:
+                desde = datetime.fromisoformat(json.load(f)['ultima_execucao'])
+        except (FileNotFoundError, KeyError, ValueError):
+            desde = None
+    inicio = datetime.now()
+    execucao = f"{inicio:%Y%m%d%H%M%S}"
+    escritores = {t: EscritorParticionado(diretorio, t, formato, execucao) for t in TABELAS}
+
+    for paciente in pacientes.values():
+        if not _alterado_desde(paciente, desde):
+            continue
+        escritores['pacientes'].escrever({
+            'cpf': paciente.cpf,
+            'data_nascimento': paciente.data_nascimento.isoformat(),
+            'convenio': paciente.convenio,
+            'leito': paciente.leito,
+            'prioritario': paciente.prioritario,
+            'data_entrada': paciente.data_entrada.isoformat() if paciente.data_entrada else None,
+        })
+        for tabela, linha in _registros_historico(paciente, desde):
+            escritores[tabela].escrever(linha)
+
+    if historicos and os.path.isdir(historicos):
+        for entrada in os.scandir(historicos):
+            if not entrada.name.endswith('.txt') or entrada.name[:-4] in pacientes:
+                continue
+            avulso = _HistoricoAvulso(entrada.path)
+            if not _alterado_desde(avulso, desde):
+                continue
+            escritores['pacientes'].escrever({'cpf': avulso.cpf})
+            for tabela, linha in _registros_historico(avulso, desde):
+                escritores[tabela].escrever(linha)
+
+    for escritor in escritores.values():
+        escritor.descarregar()
+    os.makedirs(diretorio, exist_ok=True)
+    with open(caminho_estado, 'w', encoding='utf-8') as f:
+        json.dump({'ultima_execucao': inicio.isoformat(), 'formato': formato}, f, indent=2)
+    return {t: e.linhas for t, e in escritores.items()}
+
+
+if __name__ == "__main__":
+    from sistema import SistemaMediclass
+    from main import load_data, carregar_pacientes
+    from fragmentos import FRAGMENTOS_DIR, historicos_fragmentados
+
+    parser = argparse.ArgumentParser(description="Exporta o dataset analítico do Mediclass.")
+    parser.add_argument('--formato', choices=FORMATOS, default='csv')
+    parser.add_argument('--diretorio', default=EXPORTACAO_DIR)
+    parser.add_argument('--completa', action='store_true', help="ignora a última execução e exporta tudo")
+    args = parser.parse_args()
+    if historicos_fragmentados():
+        sys.exit(f"Dados no modo fragmentado ({FRAGMENTOS_DIR}/): exportação analítica indisponível.")
+    sistema = SistemaMediclass()
+    carregar_pacientes(sistema, load_data())
+    try:
+        totais = exportar(sistema.pacientes, args.diretorio, args.formato, incremental=not args.completa,
+                          historicos=arquivamento.HISTORICOS_DIR)
+    except RuntimeError as erro:
+        sys.exit(str(erro))
+    print(", ".join(f"{t}: {n} linha(s)" for t, n in totais.items()))
@@ -0,0 +1,435 @@
+"""
+MEDICLASS: Sistema de Prontuário Eletrônico e Apoio à Decisão Clínica
+Parte do Trabalho Prático de ELE078
+
+Arquivo: fragmentos.py
+Autor: Matheus Marcondes <matheusmarcondes@ufmg.br>
+Data de criação: 2026-10-18
+Descrição:
+    Modo fragmentado do Mediclass: os pacientes são particionados pelo hash do CPF entre N
+    processos trabalhadores, cada um dono dos seus pacientes, do seu diretório de históricos e
+    da sua manutenção. O RoteadorFragmentos, no processo principal, encaminha as operações e
+    junta as consultas que envolvem todos os fragmentos (busca, censo, exportação em massa).
+    A cada inicialização (fragmentada ou não), migrar_historicos move cada histórico para o local
+    dono do CPF: o fragmento correspondente ou, sem fragmentos, de volta para historicos/.
+    Executar `python fragmentos.py` roda o benchmark de escalabilidade.
+Repositório:
+Licença: MIT License
+Dependências:
+    os, sys, json, time, zlib, threading, multiprocessing, tempfile, datetime, paciente, arquivamento, duplicados,
+    sistema
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import threading
+import multiprocessing
+import tempfile
+from datetime import date
+
+import arquivamento
+from duplicados import _registros
+
+FRAGMENTOS_DIR = 'fragmentos'
+CAMPOS_CADASTRO = ('nome', 'cpf', 'contato', 'convenio', 'data_nascimento', 'leito', 'enfermeiro_triagem')
+
+
+def fragmento_de(cpf: str, n: int) -> int:        # hash estável (crc32) para que o CPF caia sempre no mesmo fragmento
+    return zlib.crc32(cpf.encode('utf-8')) % n
+
+
+def _mesclar_textos(texto: str, outro: str) -> str:
+    # intercala por timestamp os registros de duas cópias do mesmo histórico; cabeçalho da cópia criada primeiro
+    cabecalhos = [''.join(t.splitlines(keepends=True)[:arquivamento.LINHAS_CABECALHO]) for t in (texto, outro)]
+    criado = [c.splitlines()[1] if len(c.splitlines()) > 1 else '' for c in cabecalhos]
+    cabecalho = cabecalhos[1] if criado[1] and criado[1] < criado[0] else cabecalhos[0]
+    registros = sorted(_registros(texto) + _registros(outro), key=lambda r: r[1:20] if r.startswith('[') else '')
+    return cabecalho + ''.join(registros)
+
+
+def historicos_fragmentados(diretorio: str = FRAGMENTOS_DIR) -> bool:        # algum histórico ainda está em um fragmento?
+    if not os.path.isdir(diretorio):
+        return False
+    for e in os.scandir(diretorio):
+        historicos = os.path.join(e.path, arquivamento.HISTORICOS_DIR)
+        if e.is_dir() and os.path.isdir(historicos) and any(n.endswith('.txt') for n in os.listdir(historicos)):
+            return True
+    return False
+
+
+def migrar_historicos(n: int, diretorio: str = FRAGMENTOS_DIR) -> int:
+    """
+    Move cada histórico para o local dono do CPF: com n >= 1, o fragmento correspondente; com n = 0
+    (execução não fragmentada), historicos/. Quando já existe uma cópia no destino (histórico iniciado
+    enquanto o outro ainda estava em outro local), as duas são intercaladas por timestamp. Segmentos
+    arquivados são reincorporados ao arquivo, e a manutenção volta a arquivá-los. Chamada no processo
+    principal em toda inicialização, antes de qualquer leitura de histórico. Retorna o número de históricos movidos.
+    """
+    base = os.path.abspath(diretorio)
+    raiz = os.path.abspath(arquivamento.HISTORICOS_DIR)
+    destinos = [os.path.join(base, f"{i:02d}", arquivamento.HISTORICOS_DIR) for i in range(n)] if n else [raiz]
+    origens = [raiz]
+    if os.path.isdir(base):
+        origens += sorted(os.path.join(e.path, arquivamento.HISTORICOS_DIR) for e in os.scandir(base) if e.is_dir())
+    manifestos: dict[str, dict] = {}        # diretório de históricos -> manifesto (carregado sob demanda)
+    alterados: set[str] = set()
+
+    def manifesto_de(historicos: str) -> dict:
+        if historicos not in manifestos:
+            manifestos[historicos] = arquivamento.carregar_manifesto_de(historicos)
+        return manifestos[historicos]
+
+    def descartar_segmentos(historicos: str, cpf: str) -> None:
+        for seg in manifesto_de(historicos).pop(cpf, []):
+            os.remove(os.path.join(historicos, 'arquivo', seg['arquivo']))
+            alterados.add(historicos)
+
+    movidos = 0
+    for origem in origens:
+        if not os.path.isdir(origem):
+            continue
+        for entrada in list(os.scandir(origem)):
+            if not (entrada.is_file() and entrada.name.endswith('.txt')):
+                continue
+            cpf = entrada.name[:-4]
+            destino = destinos[fragmento_de(cpf, n) if n else 0]
+            if origem == destino:
+                continue
+            texto = arquivamento.ler_completo(origem, cpf, manifesto_de(origem))
+            alvo = os.path.join(destino, entrada.name)
+            if os.path.exists(alvo):
+                texto = _mesclar_textos(texto, arquivamento.ler_completo(destino, cpf, manifesto_de(destino)))
+            os.makedirs(destino, exist_ok=True)
+            with open(alvo + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(texto)
+            os.replace(alvo + '.tmp', alvo)
+            descartar_segmentos(destino, cpf)        # os registros arquivados do destino já estão no texto mesclado
+            descartar_segmentos(origem, cpf)
+            os.remove(entrada.path)
+            movidos += 1
+    for historicos in alterados:
+        with open(os.path.join(historicos, 'arquivo', 'manifesto.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifestos[historicos], f, indent=2, ensure_ascii=False)
+    return movidos
+
+
+# ---- operações executadas dentro do processo trabalhador ----
+
+def _estado(paciente) -> dict:        # atributos públicos do paciente, enviados ao processo principal
+    return {k: v for k, v in vars(paciente).items() if not k.startswith('_')}
+
+
+def _op_criar(pacientes, campos):
+    from paciente import Paciente
+    paciente = pacientes.get(campos['cpf'])
+    if paciente is None:
+        paciente = Paciente(**{k: campos[k] for k in CAMPOS_CADASTRO})
+        vars(paciente).update({k: v for k, v in campos.items() if k not in CAMPOS_CADASTRO})
+        pacientes[paciente.cpf] = paciente
+    return _estado(paciente)
+
+
+def _op_obter(pacientes, cpf):
+    paciente = pacientes.get(cpf)
+    return _estado(paciente) if paciente else None
+
+
+def _op_definir(pacientes, cpf, nome, valor):
+    setattr(pacientes[cpf], nome, valor)
+
+
+def _op_chamar(pacientes, cpf, metodo, args):
+    paciente = pacientes[cpf]
+    resultado = getattr(paciente, metodo)(*args)
+    return resultado, _estado(paciente)
+
+
+def _op_listar(pacientes):
+    return [_estado(p) for p in pacientes.values()]
+
+
+def _op_buscar(pacientes, termo):
+    termo = termo.casefold()
+    return [(p.cpf, p.nome, p.leito) for p in pacientes.values() if termo in p.nome.casefold()]
+
+
+def _op_censo(pacientes):
+    return {
+        'pacientes': len(pacientes),
+        'prioritarios': sum(1 for p in pacientes.values() if p.prioritario),
+        'internados': sum(1 for p in pacientes.values() if p.leito),
+    }
+
+
+def _op_exportar(pacientes, diretorio):
+    from sistema import renderizar_prontuario
+    os.makedirs(diretorio, exist_ok=True)
+    for paciente in pacientes.values():
+        with open(os.path.join(diretorio, f"prontuario_{paciente.cpf}.txt"), 'w', encoding='utf-8') as f:
+            f.write(renderizar_prontuario(paciente))
+    return len(pacientes)
+
+
+def _op_lote(pacientes, operacoes):
+    return [_OPERACOES[op](pacientes, *args) for op, args in operacoes]
+
+
+_OPERACOES = {
+    'criar': _op_criar,
+    'obter': _op_obter,
+    'definir': _op_definir,
+    'chamar': _op_chamar,
+    'listar': _op_listar,
+    'buscar': _op_buscar,
+    'censo': _op_censo,
+    'exportar': _op_exportar,
+    'lote': _op_lote,
+}
+
+
+def _trabalhador(diretorio: str, conexao, manutencao: bool) -> None:
+    # cada fragmento trabalha no seu próprio diretório: historicos/ e manifesto de arquivamento são exclusivos dele
+    os.makedirs(diretorio, exist_ok=True)
+    os.chdir(diretorio)
+    thread_manutencao = None
+    if manutencao:
+        from arquivamento import ManutencaoHistoricos
+        thread_manutencao = ManutencaoHistoricos()
+        thread_manutencao.start()
+    pacientes = {}
+    while True:
+        op, args = conexao.recv()
+        if op == 'encerrar':
+            break
+        try:
+            conexao.send(('ok', _OPERACOES[op](pacientes, *args)))
+        except Exception as erro:
+            conexao.send(('erro', repr(erro)))
+    if thread_manutencao:
+        thread_manutencao.parar()
+    conexao.send(('ok', None))
+
+
+# ---- processo principal ----
+
+class RoteadorFragmentos:        # inicia os trabalhadores e encaminha as operações para o fragmento dono do CPF
+
+    def __init__(self, n: int, diretorio: str = FRAGMENTOS_DIR, manutencao: bool = True):
+        self.n = n
+        self._conexoes = []
+        self._processos = []
+        self._locks = [threading.Lock() for _ in range(n)]    # uma requisição por vez em cada pipe
+        base = os.path.abspath(diretorio)
+        for i in range(n):
+            local, remoto = multiprocessing.Pipe()
+            proc = multiprocessing.Process(
+                target=_trabalhador, args=(os.path.join(base, f"{i:02d}"), remoto, manutencao),
+                name=f"mediclass-fragmento-{i}", daemon=True
+            )
+            proc.start()
+            self._conexoes.append(local)
+            self._processos.append(proc)
+
+    def _resposta(self, i: int):
+        status, valor = self._conexoes[i].recv()
+        if status == 'erro':
+            raise RuntimeError(f"Fragmento {i}: {valor}")
+        return valor
+
+    def executar(self, cpf: str, op: str, *args):
+        i = fragmento_de(cpf, self.n)
+        with self._locks[i]:
+            self._conexoes[i].send((op, args))
+            return self._resposta(i)
+
+    def difundir(self, op: str, *args) -> list:        # envia a todos os fragmentos antes de esperar, para que trabalhem em paralelo
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            for conexao in self._conexoes:
+                conexao.send((op, args))
+            return [self._resposta(i) for i in range(self.n)]
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    def executar_lote(self, operacoes: list[tuple[str, str, tuple]]) -> list:
+        """
+        Agrupa operações (cpf, op, args) por fragmento, envia um lote a cada fragmento e
+        devolve os resultados na ordem original.
+        """
+        grupos: list[list[int]] = [[] for _ in range(self.n)]
+        for idx, (cpf, _, _) in enumerate(operacoes):
+            grupos[fragmento_de(cpf, self.n)].append(idx)
+        resultados = [None] * len(operacoes)
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            for i, idxs in enumerate(grupos):
+                if idxs:
+                    self._conexoes[i].send(('lote', ([(operacoes[k][1], operacoes[k][2]) for k in idxs],)))
+            for i, idxs in enumerate(grupos):
+                if idxs:
+                    for k, valor in zip(idxs, self._resposta(i)):
+                        resultados[k] = valor
+        finally:
+            for lock in self._locks:
+                lock.release()
+        return resultados
+
+    # ---- consultas entre fragmentos ----
+
+    def buscar(self, termo: str) -> list[tuple[str, str, str]]:
+        return sorted((r for parcial in self.difundir('buscar', termo) for r in parcial), key=lambda r: r[1])
+
+    def censo(self) -> dict:
+        total: dict[str, int] = {}
+        for parcial in self.difundir('censo'):
+            for k, v in parcial.items():
+                total[k] = total.get(k, 0) + v
+        return total
+
+    def exportar_todos(self, diretorio: str) -> int:
+        return sum(self.difundir('exportar', os.path.abspath(diretorio)))
+
+    def encerrar(self) -> None:
+        for i, conexao in enumerate(self._conexoes):
+            with self._locks[i]:
+                conexao.send(('encerrar', ()))
+                self._resposta(i)
+        for proc in self._processos:
+            proc.join()
+
+
+class PacienteRemoto:        # representante no processo principal de um Paciente que vive em um fragmento
+
+    def __init__(self, roteador: RoteadorFragmentos, estado: dict):
+        object.__setattr__(self, '_roteador', roteador)
+        self.__dict__.update(estado)
+
+    def __setattr__(self, nome: str, valor) -> None:        # alterações de atributos são replicadas no fragmento
+        object.__setattr__(self, nome, valor)
+        self._roteador.executar(self.cpf, 'definir', self.cpf, nome, valor)
+
+    def _chamar(self, metodo: str, *args):
+        resultado, estado = self._roteador.executar(self.cpf, 'chamar', self.cpf, metodo, args)
+        self.__dict__.update(estado)
+        return resultado
+
+    def registrar_entrada(self) -> None:
+        self._chamar('registrar_entrada')
+
+    def atualizar_historico(self, registro: str) -> None:
+        self._chamar('atualizar_historico', registro)
+
+    def consultar_historico(self) -> str:
+        return self._chamar('consultar_historico')
+
+    def adicionar_exame(self, exame: str, resultado: str) -> None:
+        self._chamar('adicionar_exame', exame, resultado)
+
+    def adicionar_exames(self, exames: list[tuple[str, str]]) -> None:
+        self._chamar('adicionar_exames', exames)
+
+    def registros_desde(self, inicio) -> list[str]:
+        return self._chamar('registros_desde', inicio)
+
+    def exames_pendentes(self) -> int:
+        return self._chamar('exames_pendentes')
+
+    def atualizado_desde(self, inicio) -> bool:
+        return self._chamar('atualizado_desde', inicio)
+
+    # listas não podem ser alteradas no representante (a cópia local seria descartada): as alterações vão ao fragmento
+    def adicionar_diagnosticos(self, diagnosticos: list) -> None:
+        self._chamar('adicionar_diagnosticos', diagnosticos)
+
+    def adicionar_prescricao(self, medicacao: str, posologia: str, intervalo: str, periodo: str) -> None:
+        self._chamar('adicionar_prescricao', medicacao, posologia, intervalo, periodo)
+
+
+class MapaPacientesFragmentado:        # substitui SistemaMediclass.pacientes no modo fragmentado
+
+    def __init__(self, roteador: RoteadorFragmentos):
+        self.roteador = roteador
+
+    def criar(self, **campos) -> PacienteRemoto:        # usada como SistemaMediclass.fabrica_paciente
+        return PacienteRemoto(self.roteador, self.roteador.executar(campos['cpf'], 'criar', campos))
+
+    def get(self, cpf: str, padrao=None):
+        estado = self.roteador.executar(cpf, 'obter', cpf)
+        return PacienteRemoto(self.roteador, estado) if estado else padrao
+
+    def __getitem__(self, cpf: str) -> PacienteRemoto:
+        paciente = self.get(cpf)
+        if paciente is None:
+            raise KeyError(cpf)
+        return paciente
+
+    def __setitem__(self, cpf: str, paciente) -> None:
+        if not isinstance(paciente, PacienteRemoto):        # Paciente local: recriado no fragmento dono do CPF
+            self.roteador.executar(cpf, 'criar', _estado(paciente))
+
+    def __contains__(self, cpf: str) -> bool:
+        return self.get(cpf) is not None
+
+    def __len__(self) -> int:
+        return self.roteador.censo()['pacientes']
+
+    def values(self):
+        for parcial in self.roteador.difundir('listar'):
+            for estado in parcial:
+                yield PacienteRemoto(self.roteador, estado)
+
+    def items(self):
+        for paciente in self.values():
+            yield paciente.cpf, paciente
+
+    def __iter__(self):
+        for paciente in self.values():
+            yield paciente.cpf
+
+
+# ---- benchmark ----
+
+def _carga(n_pacientes: int, registros: int) -> tuple[list, list]:
+    # carga multi-enfermaria: cadastro, entrada e atualizações de histórico distribuídos por 4 alas
+    alas = ('A', 'B', 'C', 'UTI')
+    cadastros = [
+        (cpf, 'criar', ({
+            'nome': f"Paciente {i}", 'cpf': cpf, 'contato': '', 'convenio': 'SUS',
+            'data_nascimento': date(1950 + i % 60, 1 + i % 12, 1 + i % 28),
+            'leito': f"{alas[i % 4]}-{i % 40 + 1:02d}", 'enfermeiro_triagem': ''
+        },))
+        for i, cpf in ((i, f"{i:011d}") for i in range(n_pacientes))
+    ]
+    atualizacoes = []
+    for i in range(n_pacientes):
+        cpf = f"{i:011d}"
+        atualizacoes.append((cpf, 'chamar', (cpf, 'registrar_entrada', ())))
+        for k in range(registros):
+            atualizacoes.append((cpf, 'chamar', (cpf, 'atualizar_historico', (f"Evolução {k}: estável",))))
+    return cadastros, atualizacoes
+
+
+def benchmark(n_pacientes: int = 4000, registros: int = 10, fragmentos: tuple = (1, 2, 4)) -> None:
+    cadastros, atualizacoes = _carga(n_pacientes, registros)
+    total_ops = len(cadastros) + len(atualizacoes) + 1
+    for n in fragmentos:
+        with tempfile.TemporaryDirectory() as tmp:
+            roteador = RoteadorFragmentos(n, tmp, manutencao=False)
+            inicio = time.perf_counter()
+            roteador.executar_lote(cadastros)
+            roteador.executar_lote(atualizacoes)
+            roteador.buscar('Paciente 1')
+            duracao = time.perf_counter() - inicio
+            roteador.encerrar()
+        print(f"{n} fragmento(s): {total_ops} operações em {duracao:.2f} s ({total_ops / duracao:.0f} op/s)")
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    benchmark(n, fragmentos=tuple(sorted({1, 2, 4, os.cpu_count() or 1})))
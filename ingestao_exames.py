@@ -0,0 +1,220 @@
+"""
+MEDICLASS: Sistema de Prontuário Eletrônico e Apoio à Decisão Clínica
+Parte do Trabalho Prático de ELE078
+
+Arquivo: ingestao_exames.py
+Autor: Matheus Marcondes <matheusmarcondes@ufmg.br>
+Data de criação: 2026-10-18
+Descrição:
+    Ingestão em lote dos resultados gerados pelos equipamentos de laboratório e imagem. Arquivos
+    delimitados (CSV/TSV) ou JSON Lines deixados na caixa de entrada são lidos em fluxo, o código
+    do exame é mapeado para ExamType, o CPF é validado contra os pacientes cadastrados e os
+    resultados são gravados em lotes, uma gravação por paciente (Paciente.adicionar_exames). Linhas
+    rejeitadas (e arquivos ilegíveis) vão para um arquivo de rejeitados (dead-letter) com o motivo.
+    A ingestão automática fica na trilha de auditoria sob a identidade 'laboratorio'.
+Repositório:
+Licença: MIT License
+Dependências:
+    os, csv, json, time, threading, datetime, profissionais, duplicados, auditoria
+"""
+
+import os
+import csv
+import json
+import time
+import threading
+from datetime import datetime
+
+from profissionais import ExamType
+from duplicados import sem_acentos
+from auditoria import IdentidadeSistema
+
+LABORATORIO_DIR = 'laboratorio'
+ENTRADA_DIR = os.path.join(LABORATORIO_DIR, 'entrada')
+PROCESSADOS_DIR = os.path.join(LABORATORIO_DIR, 'processados')
+REJEITADOS_FILE = os.path.join(LABORATORIO_DIR, 'rejeitados.jsonl')
+TAMANHO_LOTE = 500
+lock_ingestao = threading.Lock()        # monitor em segundo plano e opção do menu nunca processam a caixa de entrada ao mesmo tempo
+IDADE_MINIMA_ARQUIVO = 2.0      # segundos sem modificação antes de considerar o arquivo completo
+INTERVALO_VERIFICACAO = 5.0     # segundos entre varreduras da caixa de entrada
+EXTENSOES = ('.csv', '.tsv', '.txt', '.jsonl', '.ndjson')
+USUARIO_LABORATORIO = IdentidadeSistema('laboratorio')        # autor na trilha de auditoria da ingestão automática
+
+
+def _normalizar_codigo(codigo: str) -> str:
+    return ''.join(c for c in sem_acentos(codigo).casefold() if c.isalnum())
+
+
+# código do equipamento -> ExamType: aceita o nome do enum (HEMOGRAMA) ou a descrição (Hemograma), sem acentos/pontuação
+_CODIGOS_EXAME = {}
+for _tipo in ExamType:
+    _CODIGOS_EXAME[_normalizar_codigo(_tipo.name)] = _tipo
+    _CODIGOS_EXAME[_normalizar_codigo(_tipo.value)] = _tipo
+
+
+def tipo_exame(codigo: str) -> ExamType | None:
+    return _CODIGOS_EXAME.get(_normalizar_codigo(codigo or ''))
+
+
+def ler_registros(caminho: str):
+    """
+    Gera (número da linha, registro) lendo o arquivo em fluxo. JSON Lines por extensão;
+    demais arquivos são delimitados, com cabeçalho contendo cpf, exame, resultado e instante.
+    """
+    with open(caminho, 'r', encoding='utf-8-sig', newline='') as f:        # -sig: CSV exportado pelo Excel começa com BOM
+        if caminho.endswith(('.jsonl', '.ndjson')):
+            for n, linha in enumerate(f, 1):
+                if not linha.strip():
+                    continue
+                try:
+                    registro = json.loads(linha)
+                except ValueError as erro:
+                    yield n, {'_erro': f"JSON inválido: {erro}", '_bruto': linha.rstrip('\n')}
+                    continue
+                if isinstance(registro, dict):
+                    yield n, registro
+                else:
+                    yield n, {'_erro': "registro JSON não é um objeto", '_bruto': linha.rstrip('\n')}
+            return
+        amostra = f.read(4096)
+        f.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=',;\t|')
+        except csv.Error:
+            dialeto = csv.excel_tab if caminho.endswith('.tsv') else csv.excel
+        leitor = csv.DictReader(f, dialect=dialeto)
+        leitor.fieldnames = [c.strip().casefold() for c in (leitor.fieldnames or [])]
+        for n, registro in enumerate(leitor, 2):
+            yield n, registro
+
+
+def _validar(registro: dict, buscar) -> tuple[str, ExamType, str, str] | str:
+    # retorna (cpf, tipo, resultado, instante) ou a mensagem de rejeição; buscar(cpf) -> paciente ou None
+    if '_erro' in registro:
+        return registro['_erro']
+    cpf = str(registro.get('cpf') or '').strip()
+    codigo = str(registro.get('exame') or registro.get('codigo') or '').strip()
+    resultado = str(registro.get('resultado') or '').strip()
+    instante = str(registro.get('instante') or registro.get('timestamp') or '').strip()
+    if not cpf or buscar(cpf) is None:
+        return f"paciente não cadastrado: '{cpf}'"
+    tipo = tipo_exame(codigo)
+    if tipo is None:
+        return f"código de exame desconhecido: '{codigo}'"
+    if not resultado:
+        return "resultado vazio"
+    if instante:
+        try:
+            instante = datetime.fromisoformat(instante).strftime('%Y-%m-%d %H:%M')
+        except ValueError:
+            return f"instante inválido: '{instante}'"
+    return cpf, tipo, resultado, instante
+
+
+def _gravar_lote(sistema, lote: list, usuario, encontrados: dict) -> None:
+    por_paciente: dict[str, list] = {}        # mantém a ordem de chegada dentro de cada paciente
+    for cpf, tipo, resultado, instante in lote:
+        por_paciente.setdefault(cpf, []).append((tipo.value, f"{resultado} (laudo de {instante})" if instante else resultado))
+    for cpf, exames in por_paciente.items():
+        paciente = encontrados[cpf]
+        paciente.adicionar_exames(exames)                        # uma gravação (uma chamada ao fragmento) por paciente
+        for exame, _ in exames:
+            sistema.estatisticas.registrar_exame(exame)
+            sistema.auditoria.registrar(usuario, cpf, 'exame_laboratorio')
+        sistema.replicar(paciente)                              # um instantâneo por paciente do lote para os standbys
+
+
+def _rejeitar(rejeitos, caminho: str, n: int, motivo: str, registro: dict) -> None:        # linha no arquivo de rejeitados
+    rejeitos.write(json.dumps({
+        'arquivo': os.path.basename(caminho), 'linha': n, 'motivo': motivo,
+        'registro': registro, 'instante': datetime.now().isoformat(timespec='seconds')
+    }, ensure_ascii=False, default=str) + '\n')
+
+
+def processar_arquivo(sistema, caminho: str, usuario=USUARIO_LABORATORIO) -> dict:
+    """
+    Ingere um arquivo de resultados. O arquivo é movido para a pasta de processados antes da
+    leitura, de modo que uma falha no meio nunca faz a próxima varredura gravar os mesmos
+    resultados outra vez. Retorna {'aceitos', 'rejeitados'}.
+    """
+    aceitos = rejeitados = 0
+    lote = []
+    encontrados: dict = {}        # CPF -> paciente (ou None): uma consulta por CPF distinto, também no modo fragmentado
+
+    def buscar(cpf: str):
+        if cpf not in encontrados:
+            encontrados[cpf] = sistema.pacientes.get(cpf)
+        return encontrados[cpf]
+
+    os.makedirs(PROCESSADOS_DIR, exist_ok=True)
+    processado = os.path.join(PROCESSADOS_DIR, f"{datetime.now():%Y%m%d%H%M%S}_{os.path.basename(caminho)}")
+    os.replace(caminho, processado)
+    with open(REJEITADOS_FILE, 'a', encoding='utf-8') as rejeitos:
+        try:
+            try:
+                for n, registro in ler_registros(processado):
+                    validado = _validar(registro, buscar)
+                    if isinstance(validado, str):
+                        rejeitados += 1
+                        registro.pop('_erro', None)
+                        _rejeitar(rejeitos, caminho, n, validado, registro)
+                        continue
+                    lote.append(validado)
+                    aceitos += 1
+                    if len(lote) >= TAMANHO_LOTE:
+                        _gravar_lote(sistema, lote, usuario, encontrados)
+                        lote.clear()
+            except (UnicodeDecodeError, csv.Error) as erro:    # restante do arquivo ilegível: as linhas já validadas são gravadas
+                rejeitados += 1
+                _rejeitar(rejeitos, caminho, 0, f"arquivo ilegível: {erro}", {})
+            if lote:
+                _gravar_lote(sistema, lote, usuario, encontrados)
+        except (OSError, RuntimeError) as erro:                # falha de gravação: o arquivo fica em processados para reenvio
+            _rejeitar(rejeitos, caminho, 0, f"ingestão interrompida com {aceitos - len(lote)} resultado(s) gravado(s), "
+                                            f"arquivo em {processado}: {erro}", {})
+            raise
+    return {'aceitos': aceitos, 'rejeitados': rejeitados}
+
+
+def processar_entrada(sistema, usuario=USUARIO_LABORATORIO, diretorio: str = ENTRADA_DIR) -> dict:
+    """
+    Processa os arquivos completos da caixa de entrada (sem modificação recente), em ordem de
+    chegada. Retorna os totais de arquivos, aceitos e rejeitados.
+    """
+    totais = {'arquivos': 0, 'aceitos': 0, 'rejeitados': 0}
+    os.makedirs(diretorio, exist_ok=True)
+    with lock_ingestao:
+        agora = time.time()
+        prontos = sorted(
+            (e for e in os.scandir(diretorio)
+             if e.is_file() and e.name.endswith(EXTENSOES) and agora - e.stat().st_mtime >= IDADE_MINIMA_ARQUIVO),
+            key=lambda e: e.stat().st_mtime
+        )
+        for entrada in prontos:
+            resumo = processar_arquivo(sistema, entrada.path, usuario)
+            totais['arquivos'] += 1
+            totais['aceitos'] += resumo['aceitos']
+            totais['rejeitados'] += resumo['rejeitados']
+    return totais
+
+
+class MonitorLaboratorio(threading.Thread):        # observa a caixa de entrada e ingere os arquivos que chegam
+
+    def __init__(self, sistema, intervalo: float = INTERVALO_VERIFICACAO):
+        super().__init__(name='ingestao-laboratorio', daemon=True)
+        self.sistema = sistema
+        self.intervalo = intervalo
+        self.totais = {'arquivos': 0, 'aceitos': 0, 'rejeitados': 0}
+        self._parar = threading.Event()
+
+    def run(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            try:
+                for k, v in processar_entrada(self.sistema).items():
+                    self.totais[k] += v
+            except (OSError, RuntimeError) as erro:        # a thread continua na próxima varredura (motivo também em rejeitados)
+                print(f"\n[laboratorio] falha na ingestão de {ENTRADA_DIR}: {erro}")
+
+    def parar(self) -> None:
+        self._parar.set()
+        self.join()
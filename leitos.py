@@ -0,0 +1,144 @@
+"""
+MEDICLASS: Sistema de Prontuário Eletrônico e Apoio à Decisão Clínica
+Parte do Trabalho Prático de ELE078
+
+Arquivo: leitos.py
+Autor: Matheus Marcondes <matheusmarcondes@ufmg.br>
+Data de criação: 2026-10-18
+Descrição:
+    Módulo responsável pela classe RegistroLeitos, que carrega o mapa de alas/leitos de um
+    arquivo de configuração e mantém um bitmap de ocupação por ala, com alocação, liberação
+    e transferência de leitos em O(1).
+Repositório:
+Licença: MIT License
+Dependências:
+    json
+"""
+
+import json
+
+LEITOS_FILE = 'leitos.json'
+
+
+class RegistroLeitos:        # índice de ocupação de leitos, um leito é identificado como "<ala>-<numero>" (ex.: "A-03")
+
+    def __init__(self, alas: dict[str, int] | None = None):
+        self.capacidade: dict[str, int] = {}
+        self._ocupacao: dict[str, bytearray] = {}           # bitmap por ala: 1 = ocupado
+        self._livres: dict[str, dict[int, None]] = {}       # conjunto ordenado de leitos livres por ala (pop/remoção O(1))
+        self._ocupante: dict[str, str] = {}                 # leito -> CPF
+        self._leito_de: dict[str, str] = {}                 # CPF -> leito
+        for ala, quantidade in (alas or {}).items():
+            self.adicionar_ala(ala, quantidade)
+
+    @classmethod
+    def carregar(cls, caminho: str = LEITOS_FILE) -> 'RegistroLeitos':
+        try:
+            with open(caminho, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            return cls()                                    # sem configuração: leito continua texto livre
+        return cls(config.get('alas', {}))
+
+    def adicionar_ala(self, ala: str, quantidade: int) -> None:
+        self.capacidade[ala] = quantidade
+        self._ocupacao[ala] = bytearray(quantidade)
+        # leitos livres empilhados em ordem decrescente para que popitem() entregue o menor número primeiro
+        self._livres[ala] = dict.fromkeys(range(quantidade - 1, -1, -1))
+
+    @property
+    def configurado(self) -> bool:
+        return bool(self.capacidade)
+
+    # ---- identificação de leitos ----
+
+    @staticmethod
+    def nome_leito(ala: str, indice: int) -> str:
+        return f"{ala}-{indice + 1:02d}"
+
+    def _decodificar(self, leito: str) -> tuple[str, int] | None:
+        ala, _, numero = leito.strip().rpartition('-')
+        if ala not in self.capacidade or not numero.isdigit():
+            return None
+        indice = int(numero) - 1
+        if not 0 <= indice < self.capacidade[ala]:
+            return None
+        return ala, indice
+
+    # ---- operações O(1) ----
+
+    def alocar(self, cpf: str, ala: str) -> str | None:        # aloca qualquer leito livre da ala, retorna None se lotada
+        if cpf in self._leito_de:
+            return self._leito_de[cpf]
+        livres = self._livres.get(ala)
+        if not livres:
+            return None
+        indice, _ = livres.popitem()
+        return self._marcar(cpf, ala, indice)
+
+    def ocupar(self, cpf: str, leito: str) -> bool:            # ocupa um leito específico, falha se inexistente ou já ocupado
+        pos = self._decodificar(leito)
+        if pos is None:
+            return False
+        ala, indice = pos
+        if self._ocupacao[ala][indice]:
+            return self._ocupante.get(self.nome_leito(ala, indice)) == cpf
+        if cpf in self._leito_de:
+            self.liberar(cpf)
+        del self._livres[ala][indice]
+        self._marcar(cpf, ala, indice)
+        return True
+
+    def _marcar(self, cpf: str, ala: str, indice: int) -> str:
+        self._ocupacao[ala][indice] = 1
+        leito = self.nome_leito(ala, indice)
+        self._ocupante[leito] = cpf
+        self._leito_de[cpf] = leito
+        return leito
+
+    def liberar(self, cpf: str) -> str | None:
+        leito = self._leito_de.pop(cpf, None)
+        if leito is None:
+            return None
+        del self._ocupante[leito]
+        ala, indice = self._decodificar(leito)
+        self._ocupacao[ala][indice] = 0
+        self._livres[ala][indice] = None
+        return leito
+
+    def transferir(self, cpf: str, destino: str) -> str | None:
+        # destino pode ser uma ala (qualquer leito livre) ou um leito específico
+        if destino in self.capacidade:
+            if not self._livres[destino]:
+                return None
+            self.liberar(cpf)
+            return self.alocar(cpf, destino)
+        return destino if self.ocupar(cpf, destino) else None    # ocupar() libera o leito anterior
+
+    # ---- consultas ----
+
+    def leito_de(self, cpf: str) -> str | None:
+        return self._leito_de.get(cpf)
+
+    def ocupante(self, leito: str) -> str | None:
+        return self._ocupante.get(leito)
+
+    def livres(self, ala: str) -> int:
+        return len(self._livres.get(ala, ()))
+
+    def leitos_livres(self, ala: str, limite: int = 10) -> list[str]:
+        nomes = []
+        for indice in reversed(self._livres.get(ala, {})):
+            nomes.append(self.nome_leito(ala, indice))
+            if len(nomes) >= limite:
+                break
+        return nomes
+
+    def resumo(self) -> dict[str, dict[str, int]]:
+        return {
+            ala: {'capacidade': cap, 'ocupados': cap - len(self._livres[ala]), 'livres': len(self._livres[ala])}
+            for ala, cap in self.capacidade.items()
+        }
+
+    def mapa(self, ala: str) -> str:        # representação visual do bitmap (X = ocupado, . = livre)
+        return ''.join('X' if b else '.' for b in self._ocupacao[ala])
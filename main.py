@@ -8,18 +8,29 @@ Data de criação: 2025-06-21
 Descrição:
     Ponto de entrada para execução e testes de integração do sistema Mediclass.
     Gerencia persistência de usuários e pacientes em JSON e invoca o CLI.
+    Com `--fragmentos N`, os pacientes são distribuídos entre N processos (ver fragmentos.py).
+    Com `--replicar DIR`, as alterações são enviadas aos standbys pelo log em DIR (ver replicacao.py).
 Repositório: 
 Licença: MIT License
 Dependências:
-    json, sistema, paciente
+    json, sys, sistema, paciente, estatisticas, leitos, arquivamento, sinais_vitais, fragmentos, auditoria, recuperacao,
+    ingestao_exames, replicacao
 """
 
 import json
+import sys
 from datetime import date
 
 from sistema import SistemaMediclass
 from profissionais import Medico, Enfermeiro, Tecnico
-from paciente import Paciente
+from estatisticas import EstatisticasMediclass
+from leitos import RegistroLeitos
+from arquivamento import ManutencaoHistoricos
+from sinais_vitais import ReavaliacaoPeriodica
+from fragmentos import RoteadorFragmentos, MapaPacientesFragmentado, migrar_historicos
+import recuperacao
+from ingestao_exames import MonitorLaboratorio
+from replicacao import PublicadorReplicacao
 
 DATA_FILE = 'mediclass_data.json'
 
@@ -43,19 +54,16 @@ def save_data(data: dict) -> None:
         json.dump(data, f, indent=4, ensure_ascii=False)
 
 
-def main() -> None:
-    sistema = SistemaMediclass()
-
-    # Carregar persistência
-    raw = load_data()
-
-    # Reconstruir pacientes do JSON
+def carregar_pacientes(sistema: SistemaMediclass, raw: dict) -> None:
+    """
+    Reconstrói os pacientes do JSON no sistema (também usado pelas ferramentas de linha de comando).
+    """
     for pdata in raw.get('pacientes', []):
         try:
             data_nasc = date.fromisoformat(pdata['data_nascimento'])
         except Exception:
             continue
-        paciente = Paciente(
+        paciente = sistema.fabrica_paciente(
             nome=pdata['nome'],
             cpf=pdata['cpf'],
             contato=pdata['contato'],
@@ -65,18 +73,23 @@ def main() -> None:
             enfermeiro_triagem=pdata.get('enfermeiro_triagem', '')
         )
         paciente.prioritario = pdata.get('prioritario', False)
+        if pdata.get('data_entrada'):
+            paciente.data_entrada = date.fromisoformat(pdata['data_entrada'])
+        paciente.entradas = pdata.get('entradas', [])
+        paciente.resultados_exames = pdata.get('resultados_exames', [])
+        paciente.prescricoes = pdata.get('prescricoes', [])
+        try:
+            anamnese = recuperacao.anamnese_de_dict(pdata['ultima_anamnese']) if pdata.get('ultima_anamnese') else None
+        except (KeyError, ValueError):
+            anamnese = None
+        paciente.ultima_anamnese = anamnese
         sistema.pacientes[paciente.cpf] = paciente
 
-    # TODO: Reconstruir usuários a partir de raw.get('usuarios', [])
-    # Para enquanto testes iniciais, registramos usuários padrão
-    sistema.registrar_usuario(Medico("Dr. Teste", "CRM123", "med", "senha"))
-    sistema.registrar_usuario(Enfermeiro("Enf. Teste", "COREN456", "enf", "senha"))
-    sistema.registrar_usuario(Tecnico("Tec. Teste", "CRTR789", "tec", "senha"))
 
-    # Executar fluxo principal (CLI interativo)
-    sistema.executar()
-
-    # Persistir estado atual
+def salvar_sistema(sistema: SistemaMediclass) -> None:
+    """
+    Persiste usuários, pacientes e estatísticas do sistema no arquivo JSON.
+    """
     data = {
         'usuarios': [
             {
@@ -97,13 +110,147 @@ def main() -> None:
                 'data_nascimento': p.data_nascimento.isoformat(),
                 'leito': p.leito,
                 'enfermeiro_triagem': p.enfermeiro_triagem,
-                'prioritario': p.prioritario
+                'prioritario': p.prioritario,
+                'data_entrada': p.data_entrada.isoformat() if p.data_entrada else None,
+                'entradas': getattr(p, 'entradas', []),
+                'resultados_exames': p.resultados_exames,
+                'prescricoes': p.prescricoes,
+                'ultima_anamnese': p.ultima_anamnese.to_dict() if getattr(p, 'ultima_anamnese', None) else None
             }
             for p in sistema.pacientes.values()
-        ]
+        ],
+        'estatisticas': sistema.estatisticas.to_dict()
     }
     save_data(data)
 
 
+def main() -> None:
+    sistema = SistemaMediclass()
+
+    # Modo fragmentado: pacientes distribuídos por hash do CPF entre processos trabalhadores
+    roteador = None
+    n = 0
+    if '--fragmentos' in sys.argv:
+        valor = sys.argv[sys.argv.index('--fragmentos') + 1:][:1]
+        if not valor or not valor[0].isdigit() or int(valor[0]) < 1:
+            sys.exit("Uso: python main.py --fragmentos N (N inteiro maior ou igual a 1)")
+        n = int(valor[0])
+
+    # Históricos no local dono de cada CPF (fragmento ou historicos/) antes de qualquer leitura, em toda inicialização
+    movidos = migrar_historicos(n)
+    if movidos:
+        print(f"{movidos} histórico(s) movido(s) para {'os fragmentos' if n else 'historicos/'}.")
+
+    if n:
+        roteador = RoteadorFragmentos(n)
+        sistema.pacientes = MapaPacientesFragmentado(roteador)
+        sistema.fabrica_paciente = sistema.pacientes.criar
+
+    # Carregar persistência
+    raw = load_data()
+
+    # Reconstruir pacientes do JSON
+    carregar_pacientes(sistema, raw)
+
+    # Restaurar exames, anamneses e prioridades reconstruídos dos históricos (python recuperacao.py), uma única vez
+    atualizados = recuperacao.consumir(sistema, referencia=DATA_FILE)
+    if atualizados is not None:
+        print(f"Estado recuperado aplicado a {atualizados} paciente(s); "
+              f"arquivo renomeado para {recuperacao.RECUPERACAO_FILE}{recuperacao.SUFIXO_APLICADO}.")
+
+    # Série de sinais vitais a partir da última anamnese persistida (quando a recuperação não trouxe a série completa)
+    for paciente in sistema.pacientes.values():
+        if getattr(paciente, 'ultima_anamnese', None) and not sistema.vitais.serie(paciente.cpf):
+            sistema.vitais.registrar_anamnese(paciente.cpf, paciente.ultima_anamnese)
+
+    # Índice de detecção de cadastros duplicados
+    for paciente in sistema.pacientes.values():
+        sistema.duplicados.adicionar(paciente)
+
+    # Carregar mapa de leitos e reconstruir a ocupação a partir dos pacientes
+    sistema.leitos = RegistroLeitos.carregar()
+    for paciente in sistema.pacientes.values():
+        if paciente.leito:
+            sistema.leitos.ocupar(paciente.cpf, paciente.leito)
+
+    # Carregar estatísticas persistidas (ou reconstruir uma única vez a partir dos pacientes)
+    if 'estatisticas' in raw:
+        sistema.estatisticas = EstatisticasMediclass.from_dict(raw['estatisticas'])
+    else:
+        sistema.estatisticas.reconstruir(sistema.pacientes)
+
+    # TODO: Reconstruir usuários a partir de raw.get('usuarios', [])
+    # Para enquanto testes iniciais, registramos usuários padrão
+    sistema.registrar_usuario(Medico("Dr. Teste", "CRM123", "med", "senha"))
+    sistema.registrar_usuario(Enfermeiro("Enf. Teste", "COREN456", "enf", "senha"))
+    sistema.registrar_usuario(Tecnico("Tec. Teste", "CRTR789", "tec", "senha"))
+
+    replicar = None
+    if '--replicar' in sys.argv:
+        if roteador:
+            sys.exit("A replicação não está disponível no modo fragmentado.")
+        replicar = sys.argv[sys.argv.index('--replicar') + 1]
+
+    operar(sistema, replicar)
+
+    if roteador:
+        roteador.encerrar()
+
+
+def operar(sistema: SistemaMediclass, replicar: str | None = None, usuario=None) -> None:
+    """
+    Sequência de operação de um nó primário com o estado já carregado: replicação opcional,
+    serviços em segundo plano, CLI interativo e, ao sair, parada dos serviços e persistência.
+    Também usada pelo standby promovido (replicacao.executar_standby), que entra com o usuário já logado.
+    """
+    # Replicação warm-standby: instantâneo inicial + log de cada alteração (antes das threads que alteram pacientes)
+    if replicar:
+        sistema.replicacao = PublicadorReplicacao(replicar)
+        try:
+            sistema.replicacao.iniciar(sistema)
+        except RuntimeError as erro:
+            sys.exit(str(erro))
+        print(f"Replicação ativa em {sistema.replicacao.diretorio} (geração {sistema.replicacao.geracao}).")
+
+    # Rotação/compressão dos históricos antigos em segundo plano
+    manutencao = ManutencaoHistoricos()
+    manutencao.start()
+
+    # Reavaliação periódica das prioridades pelo escore de alerta precoce
+    reavaliacao = ReavaliacaoPeriodica(sistema.reavaliar_prioridades)
+    reavaliacao.start()
+
+    # Ingestão automática dos resultados deixados pelos equipamentos em laboratorio/entrada
+    laboratorio = MonitorLaboratorio(sistema)
+    laboratorio.start()
+
+    # Trilha de auditoria gravada em segundo plano
+    sistema.auditoria.iniciar()
+
+    # Executar fluxo principal (CLI interativo)
+    if usuario:
+        sistema.menu_principal(usuario)
+    sistema.executar()
+
+    laboratorio.parar()
+    reavaliacao.parar()
+    manutencao.parar()
+    if sistema.replicacao:
+        sistema.replicacao.parar()               # últimos eventos e censo gravados em disco
+    rel = manutencao.ultimo_relatorio
+    if rel and rel['rotacionados']:
+        print(f"Manutenção de históricos: {rel['rotacionados']} arquivo(s) rotacionado(s), "
+              f"{rel['bytes_economizados']} bytes economizados, leitura média do histórico completo "
+              f"{rel['latencia_antes_ms']:.2f} ms -> {rel['latencia_depois_ms']:.2f} ms")
+
+    # Persistir estado atual
+    salvar_sistema(sistema)
+
+    try:
+        sistema.auditoria.encerrar()             # grava os registros pendentes; uma falha aqui não impede salvar os dados
+    except OSError as erro:
+        print(f"Falha ao gravar a trilha de auditoria: {erro}")
+
+
 if __name__ == "__main__":
     main()
@@ -8,15 +8,24 @@ Data de criação: 2025-06-21
 Descrição:
     Módulo responsável pela classe Paciente, incluindo persistência de histórico médico,
     registro de entrada, atualização e consulta de histórico, e gerenciamento de exames.
+    A consulta lê de forma transparente os segmentos comprimidos criados pelo arquivamento
+    e é servida pelo cache LRU, atualizado por escrita direta a cada novo registro. Cada registro
+    gravado é também entregue aos observadores_historico (ex.: envio do log de replicação).
 Repositório: 
 Licença: MIT License
 Dependências:
-    os, datetime
+    os, datetime, arquivamento, cache
 """
 
 import os
 from datetime import date, datetime
 
+import arquivamento
+from cache import cache_prontuarios
+
+# funções (cpf, linha) chamadas a cada registro gravado, dentro da trava dos históricos (ordem preservada)
+observadores_historico: list = []
+
 class Paciente:       # Representa um paciente no sistema Mediclass.
 
     def __init__(
@@ -37,8 +46,11 @@ class Paciente:       # Representa um paciente no sistema Mediclass.
         self.data_nascimento = data_nascimento
         self.leito = leito
         self.data_entrada = None
+        self.entradas = []                      # {'instante', 'leito'} de cada entrada registrada
         self.enfermeiro_triagem = enfermeiro_triagem
         self.resultados_exames = []
+        self.diagnosticos_sugeridos = []
+        self.prescricoes = []
         self.prioritario = False
 
         # cria diretório de históricos se não existir
@@ -54,19 +66,60 @@ class Paciente:       # Representa um paciente no sistema Mediclass.
 
     def registrar_entrada(self) -> None:
         self.data_entrada = datetime.now().date()                                # registra a entrada no historico com timestamp
+        self.entradas.append({'instante': f"{datetime.now():%Y-%m-%d %H:%M:%S}", 'leito': self.leito})
         registro = f"Entrada no leito {self.leito} em {self.data_entrada}"        
         self.atualizar_historico(registro)
 
     def atualizar_historico(self, registro: str) -> None:                        # cria padrao para adicoes no historico, várias funções dependem dela
+        self._gravar_registros([registro])
+
+    def _gravar_registros(self, registros: list[str]) -> None:                   # vários registros com uma única abertura do arquivo
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open(self._historico_file, 'a', encoding='utf-8') as f:
-            f.write(f"[{timestamp}] {registro}\n")
+        linhas = [f"[{timestamp}] {registro}\n" for registro in registros]
+        with arquivamento.lock_historicos:
+            with open(self._historico_file, 'a', encoding='utf-8') as f:
+                f.writelines(linhas)
+            cache_prontuarios.anexar(('historico', self.cpf), ''.join(linhas))    # write-through: cache nunca fica desatualizado
+            for linha in linhas:
+                for observador in observadores_historico:
+                    observador(self.cpf, linha)
+
+    def consultar_historico(self) -> str:                                        # retorna o historico completo (arquivado + recente)
+        chave = ('historico', self.cpf)
+        with arquivamento.lock_historicos:                                      # evita guardar leitura anterior a um registro concorrente
+            texto = cache_prontuarios.obter(chave)
+            if texto is None:
+                texto = arquivamento.ler_historico(self._historico_file, self.cpf)
+                cache_prontuarios.guardar(chave, texto)
+        return texto
+
+    def registros_desde(self, inicio: datetime) -> list[str]:                    # fatia recente do histórico, lida do fim para o início
+        return arquivamento.ler_fatia(self._historico_file, inicio)
 
-    def consultar_historico(self) -> str:                                        # apenas retorna o historico no prompt
-        with open(self._historico_file, 'r', encoding='utf-8') as f:
-            return f.read()
+    def exames_pendentes(self) -> int:                                           # solicitações de exame ainda sem resultado
+        return arquivamento.exames_pendentes(self._historico_file)
+
+    def atualizado_desde(self, inicio: datetime) -> bool:                        # pelo último registro (a rotação reescreve o arquivo)
+        ultimo = arquivamento.ultimo_registro(self._historico_file)
+        return ultimo is not None and ultimo >= inicio.strftime('%Y-%m-%d %H:%M:%S')
 
     def adicionar_exame(self, exame: str, resultado: str) -> None:               # registro de um exame no histórico
-        self.resultados_exames.append({'exame': exame, 'resultado': resultado})
-        registro = f"Exame: {exame} | Resultado: {resultado}"
-        self.atualizar_historico(registro)
+        self.adicionar_exames([(exame, resultado)])
+
+    def adicionar_exames(self, exames: list[tuple[str, str]]) -> None:           # lote de (exame, resultado), gravado de uma vez
+        self._gravar_registros([f"Exame: {exame} | Resultado: {resultado}" for exame, resultado in exames])
+        self.resultados_exames.extend({'exame': exame, 'resultado': resultado} for exame, resultado in exames)
+
+    def adicionar_diagnosticos(self, diagnosticos: list) -> None:                # guarda as sugestões da consulta (usadas pelas estatísticas)
+        self.diagnosticos_sugeridos.extend(diagnosticos)
+        for diag in diagnosticos:                                                # persistidas no histórico (lidas pela exportação analítica)
+            self.atualizar_historico(f"Diagnóstico sugerido: {diag.categoria} | {diag.descricao} | "
+                                     f"Exames sugeridos: {'; '.join(diag.exames_sugeridos)}")
+
+    def adicionar_prescricao(self, medicacao: str, posologia: str, intervalo: str, periodo: str) -> None:    # registro de uma prescrição no histórico
+        agora = datetime.now()
+        self.prescricoes.append({
+            'instante': agora.strftime('%Y-%m-%d %H:%M:%S'), 'medicacao': medicacao,
+            'posologia': posologia, 'intervalo': intervalo, 'periodo': periodo
+        })
+        self.atualizar_historico(f"Prescrição adicionada em {agora:%Y-%m-%d %H:%M}: {medicacao}, {posologia}, {intervalo}, {periodo}")
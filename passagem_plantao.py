@@ -0,0 +1,98 @@
+"""
+MEDICLASS: Sistema de Prontuário Eletrônico e Apoio à Decisão Clínica
+Parte do Trabalho Prático de ELE078
+
+Arquivo: passagem_plantao.py
+Autor: Matheus Marcondes <matheusmarcondes@ufmg.br>
+Data de criação: 2026-10-18
+Descrição:
+    Gerador do relatório de passagem de plantão: percorre os pacientes internados ou atualizados
+    em uma janela de tempo, lê apenas a fatia recente de cada histórico (do fim do arquivo para
+    trás, via arquivamento.ler_fatia), resume última anamnese, exames pendentes e prioridade, e grava um único arquivo
+    ordenado por prioridade e leito. As seções são geradas em paralelo e guardadas em um arquivo
+    temporário, de modo que a memória não cresce com o tamanho da enfermaria.
+Repositório:
+Licença: MIT License
+Dependências:
+    re, tempfile, itertools, concurrent.futures, datetime
+"""
+
+import re
+import tempfile
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+JANELA_PADRAO_HORAS = 12
+TAMANHO_LOTE = 256              # pacientes em processamento simultâneo
+
+
+def _chave_leito(leito: str) -> tuple:        # ordenação natural: "A-02" antes de "A-10"
+    return tuple(int(p) if p.isdigit() else p for p in re.split(r'(\d+)', leito or '~'))
+
+
+def _secao(paciente, inicio: datetime) -> tuple[tuple, str]:
+    # via métodos do Paciente, que no modo fragmentado são executados no processo dono do histórico
+    fatia = paciente.registros_desde(inicio)
+    pendentes = paciente.exames_pendentes()
+    linhas = [
+        f"{'[PRIORITÁRIO] ' if paciente.prioritario else ''}Leito {paciente.leito or '-'} | "
+        f"{paciente.nome} (CPF {paciente.cpf})",
+    ]
+    anamnese = getattr(paciente, 'ultima_anamnese', None)
+    if anamnese:
+        linhas.append(
+            f"  Última triagem {anamnese.timestamp:%Y-%m-%d %H:%M}: FC {anamnese.frequencia_cardiaca}, "
+            f"PA {anamnese.pressao_arterial}, SpO2 {anamnese.saturacao_o2}%, sintoma {anamnese.tipo_sintoma.value}"
+        )
+    else:
+        linhas.append("  Sem triagem registrada.")
+    if pendentes:
+        linhas.append(f"  Exames pendentes: {pendentes}")
+    if fatia:
+        linhas.append("  Registros do plantão:")
+        linhas.extend(f"    {linha}" for linha in fatia)
+    chave = (not paciente.prioritario, _chave_leito(paciente.leito), paciente.nome)
+    return chave, "\n".join(linhas) + "\n\n"
+
+
+def _no_periodo(paciente, inicio: datetime) -> bool:
+    # internado na janela ou com registro no histórico depois do início (só o fim do arquivo é lido)
+    if paciente.data_entrada and paciente.data_entrada >= inicio.date():
+        return True
+    return paciente.atualizado_desde(inicio)
+
+
+def gerar_relatorio(pacientes, horas: float = JANELA_PADRAO_HORAS, destino: str | None = None,
+                    trabalhadores: int = 8) -> tuple[str, int]:
+    """
+    Gera o relatório de passagem de plantão para os pacientes do período. Retorna o caminho
+    do arquivo gerado e o número de pacientes incluídos.
+    """
+    fim = datetime.now()
+    inicio = fim - timedelta(hours=horas)
+    destino = destino or f"passagem_plantao_{fim:%Y%m%d_%H%M}.txt"
+    indice: list[tuple[tuple, int, int]] = []        # (chave de ordenação, posição, tamanho) de cada seção no arquivo temporário
+    candidatos = (p for p in pacientes.values() if _no_periodo(p, inicio))
+    with tempfile.TemporaryFile() as temporario, ThreadPoolExecutor(max_workers=trabalhadores) as pool:
+        while True:
+            lote = list(islice(candidatos, TAMANHO_LOTE))
+            if not lote:
+                break
+            for chave, texto in pool.map(lambda p: _secao(p, inicio), lote):
+                dados = texto.encode('utf-8')
+                indice.append((chave, temporario.tell(), len(dados)))
+                temporario.write(dados)
+        indice.sort(key=lambda item: item[0])
+        prioritarios = sum(1 for chave, _, _ in indice if not chave[0])
+        cabecalho = (
+            "Hospital da Escola de Engenharia da UFMG\nSistema MediClass\n"
+            f"Passagem de plantão: {inicio:%Y-%m-%d %H:%M} a {fim:%Y-%m-%d %H:%M}\n"
+            f"Pacientes: {len(indice)} (prioritários: {prioritarios})\n" + '-' * 50 + '\n\n'
+        )
+        with open(destino, 'wb') as saida:
+            saida.write(cabecalho.encode('utf-8'))
+            for _, posicao, tamanho in indice:                     # copia as seções na ordem final
+                temporario.seek(posicao)
+                saida.write(temporario.read(tamanho))
+    return destino, len(indice)
@@ -163,6 +163,8 @@ class Medico(Profissional):
                 if input("Febre >38°C por >3 semanas? (S/N): ").strip().upper() == 'S':
                     sugestoes.append(Diagnostico('Outros', 'Febre de origem indeterminada', ['Hemoculturas', 'Marcadores inflamatórios', 'Hemograma']))
 
+        paciente.adicionar_diagnosticos(sugestoes)    # guarda as sugestões no paciente (usadas pelas estatísticas)
+
         if sugestoes:                   # caso exista uma sugestao gerada pela arvore (sugestoes == True)
             print("\n--- Diagnósticos sugeridos ---")
             for diag in sugestoes:
@@ -201,9 +203,7 @@ class Medico(Profissional):
             intervalo = input("Intervalo das doses [horas]: ")
             periodo = input("Período de tratamento [dias]: ")
             prescricoes.append((med, pos, intervalo, periodo))
-            paciente.atualizar_historico(
-                f"Prescrição adicionada em {datetime.now().strftime('%Y-%m-%d %H:%M')}: {med}, {pos}, {intervalo}, {periodo}"
-            )
+            paciente.adicionar_prescricao(med, pos, intervalo, periodo)
         filename = f"receituario_{paciente.cpf}.txt"
         
         # criacao do arquivo a ser exportado com cabeçalho
@@ -0,0 +1,213 @@
+"""
+MEDICLASS: Sistema de Prontuário Eletrônico e Apoio à Decisão Clínica
+Parte do Trabalho Prático de ELE078
+
+Arquivo: recuperacao.py
+Autor: Matheus Marcondes <matheusmarcondes@ufmg.br>
+Data de criação: 2026-10-18
+Descrição:
+    Ferramenta de recuperação/migração: interpreta em paralelo (pool de processos) os arquivos
+    historicos/*.txt legados e reconstrói o estado estruturado de cada paciente (anamneses,
+    exames, prescrições, prioridade e entradas), gravando o resultado em um arquivo pickle de
+    carga rápida que o main.py aplica uma única vez na inicialização seguinte (o arquivo é então
+    renomeado; daí em diante esses campos são persistidos no mediclass_data.json).
+    Uso: python recuperacao.py [--processos N] [--diretorio historicos] [--saida estado_recuperado.pickle]
+Repositório:
+Licença: MIT License
+Dependências:
+    os, ast, sys, time, pickle, argparse, concurrent.futures, functools, datetime, anamnese, arquivamento
+"""
+
+import os
+import ast
+import sys
+import time
+import pickle
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from datetime import datetime
+
+import arquivamento
+from anamnese import Anamnese, TipoSintoma
+
+RECUPERACAO_FILE = 'estado_recuperado.pickle'
+SUFIXO_APLICADO = '.aplicado'
+
+
+def _novo_estado(cpf: str) -> dict:
+    return {
+        'cpf': cpf,
+        'nome': None,
+        'anamneses': [],        # dicts no formato de Anamnese.to_dict()
+        'exames': [],           # {'exame', 'resultado'}, como Paciente.resultados_exames
+        'prescricoes': [],      # {'instante', 'medicacao', 'posologia', 'intervalo', 'periodo'}
+        'entradas': [],         # (instante, leito)
+        'leito': None,
+        'prioritario': False,
+    }
+
+
+@lru_cache(maxsize=None)
+def _manifesto(historicos: str) -> dict:        # um carregamento por diretório em cada processo do pool
+    return arquivamento.carregar_manifesto_de(historicos)
+
+
+def interpretar_historico(caminho: str) -> tuple[dict, list[tuple[str, int, str]]]:
+    """
+    Interpreta um arquivo de histórico (incluindo os segmentos arquivados do seu próprio diretório,
+    ex.: fragmentos/00/historicos). Retorna o estado do paciente e a lista de erros (arquivo,
+    linha, mensagem) das linhas que não puderam ser lidas.
+    """
+    cpf = os.path.basename(caminho)[:-4]
+    estado = _novo_estado(cpf)
+    erros = []
+    historicos = os.path.dirname(os.path.abspath(caminho))
+    texto = arquivamento.ler_completo(historicos, cpf, _manifesto(historicos))
+    for n, linha in enumerate(texto.splitlines(), 1):
+        if n == 1 and linha.startswith('Histórico de '):
+            estado['nome'] = linha[len('Histórico de '):].rsplit(' (CPF:', 1)[0]
+            continue
+        if not linha.startswith('[') or len(linha) < 22:
+            continue                                                # cabeçalho, separador ou linha em branco
+        instante, registro = linha[1:20], linha[22:]
+        try:
+            if registro.startswith('Triagem: '):
+                estado['anamneses'].append(ast.literal_eval(registro[len('Triagem: '):]))
+            elif registro.startswith('Exame: '):
+                exame, _, resultado = registro[len('Exame: '):].partition(' | Resultado: ')
+                estado['exames'].append({'exame': exame, 'resultado': resultado})
+            elif registro.startswith('Prescrição adicionada em '):
+                # formato: "Prescrição adicionada em YYYY-MM-DD HH:MM: med, pos, intervalo, periodo"
+                campos = registro[len('Prescrição adicionada em ') + 18:].split(', ')
+                if len(campos) < 4:
+                    raise ValueError("prescrição incompleta")
+                med = ', '.join(campos[:-3])
+                estado['prescricoes'].append({
+                    'instante': instante, 'medicacao': med, 'posologia': campos[-3],
+                    'intervalo': campos[-2], 'periodo': campos[-1],
+                })
+            elif registro.startswith('Entrada no leito '):
+                leito = registro[len('Entrada no leito '):].rsplit(' em ', 1)[0]
+                estado['entradas'].append((instante, leito))
+                estado['leito'] = leito
+            elif registro.startswith('Transferência do leito '):
+                estado['leito'] = registro.rsplit(' para ', 1)[1]
+            elif registro.startswith('Alta: leito '):
+                estado['leito'] = ''
+            elif registro.startswith('FLAG: Prioridade ativada'):
+                estado['prioritario'] = True
+            elif registro.startswith('FLAG: Prioridade desativada'):
+                estado['prioritario'] = False
+        except (ValueError, SyntaxError, IndexError) as erro:
+            erros.append((caminho, n, f"{registro[:40]}...: {erro}"))
+    return estado, erros
+
+
+def _interpretar_seguro(caminho: str):
+    try:
+        return interpretar_historico(caminho)
+    except (OSError, UnicodeDecodeError) as erro:
+        return None, [(caminho, 0, str(erro))]
+
+
+def migrar(diretorio: str = arquivamento.HISTORICOS_DIR, saida: str = RECUPERACAO_FILE,
+           processos: int | None = None, progresso: int = 10000) -> dict:
+    """
+    Interpreta todos os históricos do diretório em paralelo e grava o estado reconstruído em `saida`.
+    Retorna um resumo com totais e erros de interpretação.
+    """
+    inicio = time.perf_counter()
+    arquivos = [e.path for e in os.scandir(diretorio) if e.is_file() and e.name.endswith('.txt')]
+    estados: dict[str, dict] = {}
+    erros: list[tuple[str, int, str]] = []
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        blocos = max(1, min(512, len(arquivos) // ((processos or os.cpu_count() or 1) * 8)))
+        for n, (estado, erros_arquivo) in enumerate(pool.map(_interpretar_seguro, arquivos, chunksize=blocos), 1):
+            if estado is not None:
+                estados[estado['cpf']] = estado
+            erros.extend(erros_arquivo)
+            if n % progresso == 0:
+                print(f"{n}/{len(arquivos)} históricos interpretados ({time.perf_counter() - inicio:.1f} s)")
+    with open(saida, 'wb') as f:
+        pickle.dump(estados, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return {'arquivos': len(arquivos), 'pacientes': len(estados), 'erros': erros,
+            'duracao_s': time.perf_counter() - inicio}
+
+
+def carregar(caminho: str = RECUPERACAO_FILE) -> dict[str, dict]:
+    try:
+        with open(caminho, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def anamnese_de_dict(dados: dict) -> Anamnese:        # reconstrói a Anamnese a partir do formato de to_dict()
+    anamnese = Anamnese(
+        dados['frequencia_cardiaca'], dados['pressao_arterial'], dados['saturacao_o2'],
+        dados['respostas_sim_nao'], TipoSintoma(dados['tipo_sintoma']), dados.get('detalhes_sintoma')
+    )
+    anamnese.timestamp = datetime.strptime(dados['timestamp'], '%Y-%m-%d %H:%M:%S')
+    return anamnese
+
+
+def aplicar(sistema, estados: dict[str, dict]) -> int:
+    """
+    Restaura nos pacientes do sistema o estado reconstruído: exames, prescrições, prioridade, leito,
+    entradas, última anamnese e a série de sinais vitais. Retorna o número de pacientes atualizados.
+    """
+    atualizados = 0
+    for cpf, estado in estados.items():
+        paciente = sistema.pacientes.get(cpf)
+        if paciente is None:                    # histórico sem cadastro correspondente no JSON
+            continue
+        paciente.resultados_exames = list(estado['exames'])
+        paciente.prescricoes = list(estado['prescricoes'])
+        paciente.prioritario = estado['prioritario']
+        if estado['leito'] is not None:                        # None: o histórico não registra entrada, transferência ou alta
+            paciente.leito = estado['leito']
+        if estado['entradas']:
+            paciente.entradas = [{'instante': instante, 'leito': leito} for instante, leito in estado['entradas']]
+            paciente.data_entrada = datetime.strptime(estado['entradas'][-1][0], '%Y-%m-%d %H:%M:%S').date()
+        anamneses = []
+        for dados in estado['anamneses']:
+            try:
+                anamneses.append(anamnese_de_dict(dados))
+            except (KeyError, ValueError):
+                continue
+        for anamnese in anamneses:
+            sistema.vitais.registrar_anamnese(cpf, anamnese)
+        paciente.ultima_anamnese = anamneses[-1] if anamneses else None
+        atualizados += 1
+    return atualizados
+
+
+def consumir(sistema, caminho: str = RECUPERACAO_FILE, referencia: str | None = None) -> int | None:
+    """
+    Aplica o estado recuperado uma única vez e renomeia o arquivo para <caminho>.aplicado. Se o
+    arquivo `referencia` (ex.: mediclass_data.json) for mais recente, o estado persistido já é
+    posterior à migração e o arquivo é apenas descartado, sem sobrescrever dados mais novos.
+    Retorna o número de pacientes atualizados ou None se não havia estado a aplicar.
+    """
+    if not os.path.exists(caminho):
+        return None
+    atualizados = 0
+    if not referencia or not os.path.exists(referencia) or os.path.getmtime(caminho) > os.path.getmtime(referencia):
+        atualizados = aplicar(sistema, carregar(caminho))
+    os.replace(caminho, caminho + SUFIXO_APLICADO)
+    return atualizados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstrói o estado dos pacientes a partir dos históricos legados.")
+    parser.add_argument('--diretorio', default=arquivamento.HISTORICOS_DIR)
+    parser.add_argument('--saida', default=RECUPERACAO_FILE)
+    parser.add_argument('--processos', type=int, default=None)
+    args = parser.parse_args()
+    resumo = migrar(args.diretorio, args.saida, args.processos)
+    print(f"{resumo['pacientes']} pacientes reconstruídos de {resumo['arquivos']} históricos "
+          f"em {resumo['duracao_s']:.1f} s; {len(resumo['erros'])} erro(s) de interpretação.")
+    for caminho, linha, mensagem in resumo['erros'][:50]:
+        print(f"  {caminho}:{linha}: {mensagem}")
+    sys.exit(1 if resumo['erros'] else 0)
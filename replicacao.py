@@ -0,0 +1,496 @@
+"""
+MEDICLASS: Sistema de Prontuário Eletrônico e Apoio à Decisão Clínica
+Parte do Trabalho Prático de ELE078
+
+Arquivo: replicacao.py
+Autor: Matheus Marcondes <matheusmarcondes@ufmg.br>
+Data de criação: 2026-10-18
+Descrição:
+    Replicação warm-standby por envio de log (log shipping). O primário (python main.py --replicar DIR)
+    grava cada mutação (cadastro, registros de histórico, triagens, exames, prioridades, leitos) como
+    um evento JSON numerado (LSN) no log de replicação, em um diretório compartilhado. Cada execução
+    do primário abre uma nova geração do log, iniciada por um instantâneo completo do sistema.
+    Os standbys aplicam o log continuamente, atendem consultas somente leitura (prontuário, busca por
+    nome, censo), medem o atraso de replicação e podem ser promovidos a primário.
+    Uso do standby (em outro diretório de trabalho): python replicacao.py [--wal replicacao]
+Repositório:
+Licença: MIT License
+Dependências:
+    os, sys, json, time, argparse, threading, datetime, paciente, arquivamento, cache, recuperacao,
+    estatisticas, leitos, sinais_vitais, duplicados
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import date, datetime
+
+import arquivamento
+from cache import cache_prontuarios
+from paciente import observadores_historico
+from recuperacao import anamnese_de_dict
+from estatisticas import EstatisticasMediclass
+from leitos import RegistroLeitos
+from sinais_vitais import MonitorSinaisVitais
+from duplicados import IndiceDuplicados, normalizar_nome
+
+WAL_DIR = 'replicacao'
+PRIMARIO_FILE = 'primario.json'
+PROMOVIDO_FILE = 'promovido.json'
+GERACOES_MANTIDAS = 2               # gerações anteriores do log preservadas no diretório
+INTERVALO_SINCRONIZACAO = 1.0       # segundos entre fsync do log (gravação em disco em grupo)
+INTERVALO_ESTATISTICAS = 5.0        # segundos entre instantâneos do censo enviados aos standbys
+INTERVALO_LEITURA = 0.5             # segundos entre leituras do log pelo standby
+
+
+def caminho_wal(diretorio: str, geracao: int) -> str:
+    return os.path.join(diretorio, f"wal-{geracao:06d}.jsonl")
+
+
+def geracoes(diretorio: str) -> list[int]:        # gerações do log presentes no diretório, em ordem crescente
+    try:
+        nomes = os.listdir(diretorio)
+    except FileNotFoundError:
+        return []
+    return sorted(int(n[4:-6]) for n in nomes if n.startswith('wal-') and n.endswith('.jsonl') and n[4:-6].isdigit())
+
+
+def instantaneo(paciente, serie: list[dict] | None = None) -> dict:
+    """
+    Estado replicado de um paciente: cadastro, leito, prioridade, exames, prescrições e última
+    anamnese. A série de sinais vitais só é incluída no instantâneo inicial de cada geração.
+    """
+    anamnese = getattr(paciente, 'ultima_anamnese', None)
+    dados = {
+        'cpf': paciente.cpf,
+        'nome': paciente.nome,
+        'contato': paciente.contato,
+        'convenio': paciente.convenio,
+        'data_nascimento': paciente.data_nascimento.isoformat(),
+        'leito': paciente.leito,
+        'enfermeiro_triagem': paciente.enfermeiro_triagem,
+        'prioritario': paciente.prioritario,
+        'data_entrada': paciente.data_entrada.isoformat() if paciente.data_entrada else None,
+        'entradas': list(getattr(paciente, 'entradas', [])),
+        'resultados_exames': list(paciente.resultados_exames),
+        'prescricoes': list(paciente.prescricoes),
+        'ultima_anamnese': anamnese.to_dict() if anamnese else None,
+    }
+    if serie is not None:
+        dados['sinais'] = serie
+    return dados
+
+
+def aplicar_instantaneo(sistema, dados: dict):        # cria ou atualiza o paciente do standby a partir do instantâneo
+    cpf = dados['cpf']
+    paciente = sistema.pacientes.get(cpf)
+    if paciente is None:
+        paciente = sistema.fabrica_paciente(
+            nome=dados['nome'],
+            cpf=cpf,
+            contato=dados['contato'],
+            convenio=dados['convenio'],
+            data_nascimento=date.fromisoformat(dados['data_nascimento']),
+            leito=dados['leito'],
+            enfermeiro_triagem=dados['enfermeiro_triagem']
+        )
+        paciente.ultima_anamnese = None
+        sistema.pacientes[cpf] = paciente
+    else:
+        paciente.nome = dados['nome']
+        paciente.contato = dados['contato']
+        paciente.convenio = dados['convenio']
+        paciente.data_nascimento = date.fromisoformat(dados['data_nascimento'])
+        paciente.enfermeiro_triagem = dados['enfermeiro_triagem']
+    if sistema.leitos.configurado and sistema.leitos.leito_de(cpf) != (dados['leito'] or None):
+        sistema.leitos.liberar(cpf)
+        if dados['leito']:
+            sistema.leitos.ocupar(cpf, dados['leito'])
+    paciente.leito = dados['leito']
+    paciente.prioritario = dados['prioritario']
+    paciente.data_entrada = date.fromisoformat(dados['data_entrada']) if dados['data_entrada'] else None
+    paciente.entradas = dados.get('entradas', [])
+    paciente.resultados_exames = dados['resultados_exames']
+    paciente.prescricoes = dados['prescricoes']
+    for leitura in dados.get('sinais', []):
+        pas, _, pad = leitura['pressao_arterial'].partition('/')
+        sistema.vitais.registrar(cpf, leitura['frequencia_cardiaca'], int(pas), int(pad),
+                                 leitura['saturacao_o2'], leitura['instante'])
+    if dados['ultima_anamnese']:
+        anamnese = anamnese_de_dict(dados['ultima_anamnese'])
+        anterior = paciente.ultima_anamnese
+        if anterior is None or anterior.timestamp != anamnese.timestamp:        # nova triagem desde o último instantâneo
+            paciente.ultima_anamnese = anamnese
+            if 'sinais' not in dados:
+                sistema.vitais.registrar_anamnese(cpf, anamnese)
+    sistema.duplicados.adicionar(paciente)
+    return paciente
+
+
+class PublicadorReplicacao(threading.Thread):        # primário: grava o log de replicação e o sincroniza em disco periodicamente
+
+    def __init__(self, diretorio: str = WAL_DIR):
+        super().__init__(name='replicacao-primario', daemon=True)
+        self.diretorio = diretorio
+        self.geracao = 0
+        self.lsn = 0
+        self.sistema = None
+        self._arquivo = None
+        self._lsn_censo = 0                 # LSN no momento do último instantâneo do censo
+        self._aviso_promocao = False
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+
+    def iniciar(self, sistema) -> None:
+        """
+        Abre uma nova geração do log, grava o instantâneo completo do sistema (ponto de partida
+        dos standbys), passa a receber os registros de histórico e inicia a thread de sincronização.
+        Recusa iniciar se um standby já foi promovido a partir deste diretório.
+        """
+        promovido = os.path.join(self.diretorio, PROMOVIDO_FILE)
+        if os.path.exists(promovido):
+            raise RuntimeError(f"Um standby foi promovido a partir de {self.diretorio} ({promovido}). "
+                               "Ressincronize este nó antes de voltar a operar como primário.")
+        os.makedirs(self.diretorio, exist_ok=True)
+        anteriores = geracoes(self.diretorio)
+        self.sistema = sistema
+        self.geracao = anteriores[-1] + 1 if anteriores else 1
+        self._arquivo = open(caminho_wal(self.diretorio, self.geracao), 'a', encoding='utf-8', newline='\n')
+        with open(os.path.join(self.diretorio, PRIMARIO_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'diretorio': os.getcwd(), 'pid': os.getpid(), 'geracao': self.geracao,
+                       'inicio': datetime.now().isoformat(timespec='seconds')}, f, indent=2)
+        with arquivamento.lock_historicos:                  # nenhum registro se perde entre o instantâneo e o observador
+            self.publicar('base', {'alas': dict(sistema.leitos.capacidade), 'pacientes': len(sistema.pacientes)})
+            for paciente in list(sistema.pacientes.values()):
+                self.publicar('paciente', instantaneo(paciente, sistema.vitais.serie(paciente.cpf)))
+                self.publicar_historico(paciente)
+            self._publicar_censo()
+            observadores_historico.append(self._registro_historico)
+        if anteriores:
+            # standbys que acompanhavam a geração anterior seguem para a nova
+            with open(caminho_wal(self.diretorio, anteriores[-1]), 'a', encoding='utf-8', newline='\n') as f:
+                f.write(json.dumps({'instante': time.time(), 'tipo': 'rotacao', 'dados': {'geracao': self.geracao}}) + '\n')
+            for antiga in anteriores[:-GERACOES_MANTIDAS]:
+                try:
+                    os.remove(caminho_wal(self.diretorio, antiga))
+                except OSError:
+                    pass                                    # ainda aberta por um standby: removida na próxima execução
+        self.start()
+
+    def publicar(self, tipo: str, dados: dict) -> None:
+        with self._lock:
+            if self._arquivo is None:
+                return
+            self.lsn += 1
+            evento = {'lsn': self.lsn, 'instante': time.time(), 'tipo': tipo, 'dados': dados}
+            self._arquivo.write(json.dumps(evento, ensure_ascii=False, default=str) + '\n')
+            self._arquivo.flush()                           # visível aos standbys de imediato; fsync em grupo na thread
+
+    def publicar_paciente(self, paciente) -> None:
+        self.publicar('paciente', instantaneo(paciente))
+
+    def publicar_historico(self, paciente) -> None:        # histórico completo, para quando o arquivo é reescrito (ex.: mesclagem)
+        self.publicar('historico_base', {'cpf': paciente.cpf, 'texto': paciente.consultar_historico()})
+
+    def publicar_remocao(self, cpf: str) -> None:
+        self.publicar('remocao', {'cpf': cpf})
+
+    def _registro_historico(self, cpf: str, linha: str) -> None:        # observador de Paciente.atualizar_historico
+        self.publicar('historico', {'cpf': cpf, 'linha': linha})
+
+    def _publicar_censo(self) -> None:
+        if self._lsn_censo == self.lsn:
+            return
+        try:
+            dados = self.sistema.estatisticas.to_dict()
+        except RuntimeError:                                # contadores alterados durante a cópia: tenta no próximo ciclo
+            return
+        self.publicar('estatisticas', dados)
+        self._lsn_censo = self.lsn
+
+    def _sincronizar(self) -> None:
+        with self._lock:
+            if self._arquivo is not None:
+                os.fsync(self._arquivo.fileno())
+
+    def run(self) -> None:
+        proximo_censo = time.monotonic() + INTERVALO_ESTATISTICAS
+        while not self._parar.wait(INTERVALO_SINCRONIZACAO):
+            self._sincronizar()
+            if time.monotonic() >= proximo_censo:
+                self._publicar_censo()
+                proximo_censo = time.monotonic() + INTERVALO_ESTATISTICAS
+            if not self._aviso_promocao and os.path.exists(os.path.join(self.diretorio, PROMOVIDO_FILE)):
+                self._aviso_promocao = True
+                print(f"\n[replicação] ATENÇÃO: um standby foi promovido a partir de {self.diretorio}; "
+                      "as alterações deste nó não são mais acompanhadas.")
+
+    def parar(self) -> None:
+        self._parar.set()
+        if self.is_alive():
+            self.join()
+        if self._registro_historico in observadores_historico:
+            observadores_historico.remove(self._registro_historico)
+        if self.sistema is not None:
+            self._publicar_censo()
+        with self._lock:
+            if self._arquivo is not None:
+                os.fsync(self._arquivo.fileno())
+                self._arquivo.close()
+                self._arquivo = None
+
+
+class AplicadorStandby(threading.Thread):        # standby: acompanha o log do primário e aplica os eventos ao sistema local
+
+    def __init__(self, sistema, diretorio: str = WAL_DIR, intervalo: float = INTERVALO_LEITURA):
+        super().__init__(name='replicacao-standby', daemon=True)
+        self.sistema = sistema
+        self.diretorio = diretorio
+        self.intervalo = intervalo
+        self.lock = threading.Lock()        # consultas que percorrem os pacientes não enxergam um evento aplicado pela metade
+        self.geracao = 0
+        self.lsn = 0
+        self.eventos_aplicados = 0
+        self.erros = 0
+        self.atraso_ultimo_s = 0.0          # instante da aplicação - instante da gravação no primário
+        self.atraso_max_s = 0.0
+        self.ultimo_evento: float | None = None
+        self._arquivo = None
+        self._posicao = 0                   # bytes do log já consumidos
+        self._resto = b''                   # linha incompleta lida no fim do arquivo
+        self._parar = threading.Event()
+
+    def _abrir(self) -> bool:
+        if not self.geracao:
+            disponiveis = geracoes(self.diretorio)
+            if not disponiveis:
+                return False
+            self.geracao = disponiveis[-1]                  # a geração mais recente começa pelo instantâneo completo
+        try:
+            self._arquivo = open(caminho_wal(self.diretorio, self.geracao), 'rb')
+        except FileNotFoundError:
+            return False
+        self._posicao = 0
+        self._resto = b''
+        return True
+
+    def aplicar_pendentes(self) -> int:
+        """
+        Lê o que foi acrescentado ao log desde a última leitura e aplica os eventos completos,
+        seguindo para a próxima geração quando o primário reinicia. Retorna o número de eventos aplicados.
+        """
+        aplicados = 0
+        while True:
+            if self._arquivo is None and not self._abrir():
+                return aplicados
+            bloco = self._arquivo.read()
+            if not bloco:
+                return aplicados
+            self._posicao += len(bloco)
+            linhas = (self._resto + bloco).split(b'\n')
+            self._resto = linhas.pop()
+            for linha in linhas:
+                if not linha.strip():
+                    continue
+                try:
+                    evento = json.loads(linha)
+                except ValueError:
+                    self.erros += 1
+                    continue
+                if evento['tipo'] == 'rotacao':
+                    self._arquivo.close()
+                    self._arquivo = None
+                    self.geracao = evento['dados']['geracao']
+                    break
+                with self.lock:
+                    self._aplicar(evento)
+                aplicados += 1
+
+    def _aplicar(self, evento: dict) -> None:
+        tipo, dados = evento['tipo'], evento['dados']
+        sistema = self.sistema
+        if tipo == 'base':                                  # nova geração: o estado é reconstruído do zero
+            sistema.pacientes.clear()
+            sistema.leitos = RegistroLeitos(dados['alas'])
+            sistema.vitais = MonitorSinaisVitais()
+            sistema.duplicados = IndiceDuplicados()
+            sistema.estatisticas = EstatisticasMediclass()
+        elif tipo == 'paciente':
+            aplicar_instantaneo(sistema, dados)
+        elif tipo == 'historico':
+            paciente = sistema.pacientes.get(dados['cpf'])
+            if paciente is not None:
+                with arquivamento.lock_historicos:
+                    with open(paciente._historico_file, 'a', encoding='utf-8') as f:
+                        f.write(dados['linha'])
+                    cache_prontuarios.anexar(('historico', paciente.cpf), dados['linha'])
+        elif tipo == 'historico_base':
+            paciente = sistema.pacientes.get(dados['cpf'])
+            if paciente is not None:
+                with arquivamento.lock_historicos:
+                    with open(paciente._historico_file, 'w', encoding='utf-8') as f:
+                        f.write(dados['texto'])
+                    cache_prontuarios.invalidar(('historico', paciente.cpf))
+        elif tipo == 'remocao':
+            sistema.leitos.liberar(dados['cpf'])
+            sistema.duplicados.remover(dados['cpf'])
+            sistema.pacientes.pop(dados['cpf'], None)
+        elif tipo == 'estatisticas':
+            sistema.estatisticas = EstatisticasMediclass.from_dict(dados)
+        self.lsn = evento['lsn']
+        self.eventos_aplicados += 1
+        self.ultimo_evento = evento['instante']
+        self.atraso_ultimo_s = max(0.0, time.time() - evento['instante'])
+        self.atraso_max_s = max(self.atraso_max_s, self.atraso_ultimo_s)
+
+    def status(self) -> dict:        # métricas de replicação exibidas no menu do standby
+        try:
+            pendente = os.path.getsize(caminho_wal(self.diretorio, self.geracao)) - self._posicao + len(self._resto)
+        except (FileNotFoundError, ValueError):
+            pendente = 0
+        return {
+            'geracao': self.geracao,
+            'lsn': self.lsn,
+            'eventos_aplicados': self.eventos_aplicados,
+            'erros': self.erros,
+            'atraso_ultimo_s': self.atraso_ultimo_s,
+            'atraso_max_s': self.atraso_max_s,
+            'pendente_bytes': pendente,
+            'sem_eventos_s': time.time() - self.ultimo_evento if self.ultimo_evento else None,
+        }
+
+    def run(self) -> None:
+        while not self._parar.is_set():
+            self.aplicar_pendentes()
+            self._parar.wait(self.intervalo)
+
+    def parar(self) -> None:
+        self._parar.set()
+        if self.is_alive():
+            self.join()
+        self.aplicar_pendentes()                            # aplica o que chegou depois da última leitura
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def promover(self) -> None:
+        """
+        Aplica o restante do log, encerra a replicação e marca o diretório como promovido: a partir
+        daqui este nó aceita escritas e o antigo primário recusa reiniciar sobre o mesmo log.
+        """
+        self.parar()
+        with open(os.path.join(self.diretorio, PROMOVIDO_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'diretorio': os.getcwd(), 'geracao': self.geracao, 'lsn': self.lsn,
+                       'instante': datetime.now().isoformat(timespec='seconds')}, f, indent=2)
+
+
+def buscar_por_nome(pacientes, termo: str) -> list:        # todos os tokens do termo presentes no nome (sem acentos/partículas)
+    tokens = normalizar_nome(termo)
+    if not tokens:
+        return []
+    return [p for p in pacientes.values() if all(t in ' '.join(normalizar_nome(p.nome)) for t in tokens)]
+
+
+def menu_standby(sistema, aplicador: AplicadorStandby, usuario) -> bool:        # retorna True quando o nó é promovido
+    while True:
+        print("\n--- Standby (somente leitura) ---")
+        print("1. Visualizar prontuário")
+        print("2. Buscar paciente por nome")
+        print("3. Painel de estatísticas (censo)")
+        print("4. Status da replicação")
+        print("5. Promover a primário")
+        print("0. Logout")
+        escolha = input("Escolha uma opção: ")
+        if escolha == '0':
+            print("Logout realizado.")
+            return False
+        elif escolha == '1':
+            sistema.op_visualizar_prontuario(usuario)
+        elif escolha == '2':
+            termo = input("Nome (ou parte do nome): ")
+            with aplicador.lock:
+                encontrados = buscar_por_nome(sistema.pacientes, termo)
+            for p in encontrados[:50]:
+                print(f"CPF {p.cpf} - {p.nome} | Leito {p.leito or '-'}{' | PRIORITÁRIO' if p.prioritario else ''}")
+            print(f"{len(encontrados)} paciente(s) encontrado(s).")
+        elif escolha == '3':
+            sistema.op_painel_estatisticas(usuario)
+        elif escolha == '4':
+            s = aplicador.status()
+            print(f"Geração {s['geracao']}, LSN {s['lsn']} | {s['eventos_aplicados']} evento(s) aplicado(s), "
+                  f"{s['erros']} erro(s) | atraso {s['atraso_ultimo_s']:.2f} s (máx. {s['atraso_max_s']:.2f} s) | "
+                  f"pendente {s['pendente_bytes']} bytes"
+                  + (f" | último evento há {s['sem_eventos_s']:.0f} s" if s['sem_eventos_s'] is not None else ""))
+        elif escolha == '5':
+            if input("Confirmar promoção? O primário atual deixará de ser acompanhado (S/N): ").strip().upper() == 'S':
+                aplicador.promover()
+                sistema.auditoria.registrar(usuario, '*', 'promocao_standby')
+                print(f"Standby promovido no LSN {aplicador.lsn} (geração {aplicador.geracao}).")
+                return True
+        else:
+            print("Opção inválida.")
+
+
+def executar_standby(diretorio: str = WAL_DIR, replicar: str | None = None) -> None:
+    """
+    Acompanha o log de `diretorio` em modo somente leitura. Após a promoção segue a mesma sequência
+    de operação do main.py (main.operar), publicando em `replicar` quando informado.
+    """
+    from sistema import SistemaMediclass
+    from profissionais import Medico, Enfermeiro, Tecnico
+    from main import operar
+
+    if replicar and os.path.abspath(replicar) == os.path.abspath(diretorio):
+        sys.exit("O nó promovido deve replicar para um diretório diferente do log acompanhado.")
+
+    try:
+        with open(os.path.join(diretorio, PRIMARIO_FILE), 'r', encoding='utf-8') as f:
+            primario = json.load(f)
+    except FileNotFoundError:
+        primario = {}
+    if primario.get('diretorio') == os.getcwd():
+        sys.exit("O standby deve ser executado em um diretório de trabalho diferente do primário.")
+    if os.path.exists(os.path.join(diretorio, PROMOVIDO_FILE)):
+        sys.exit(f"{diretorio} já foi promovido; inicie um novo primário antes de acompanhar este log.")
+    if os.path.isdir(arquivamento.HISTORICOS_DIR):          # os históricos locais são reconstruídos a partir do log
+        backup = f"{arquivamento.HISTORICOS_DIR}.{datetime.now():%Y%m%d%H%M%S}.bak"
+        os.replace(arquivamento.HISTORICOS_DIR, backup)
+        print(f"Históricos locais anteriores movidos para {backup}.")
+
+    sistema = SistemaMediclass()
+    # mesmos usuários padrão do main.py (usuários ainda não são persistidos)
+    sistema.registrar_usuario(Medico("Dr. Teste", "CRM123", "med", "senha"))
+    sistema.registrar_usuario(Enfermeiro("Enf. Teste", "COREN456", "enf", "senha"))
+    sistema.registrar_usuario(Tecnico("Tec. Teste", "CRTR789", "tec", "senha"))
+
+    aplicador = AplicadorStandby(sistema, diretorio)
+    inicio = time.perf_counter()
+    n = aplicador.aplicar_pendentes()
+    print(f"Standby sincronizado com {diretorio} (geração {aplicador.geracao}, LSN {aplicador.lsn}): "
+          f"{n} evento(s) aplicado(s) em {time.perf_counter() - inicio:.1f} s, {len(sistema.pacientes)} paciente(s).")
+    aplicador.start()
+    sistema.auditoria.iniciar()
+
+    promovido = False
+    while not promovido:
+        usuario = sistema.login()
+        if not usuario:
+            print("Encerrando standby.")
+            break
+        promovido = menu_standby(sistema, aplicador, usuario)
+    if promovido:
+        operar(sistema, replicar, usuario)                  # segue como primário, com o menu completo
+    else:
+        aplicador.parar()
+        sistema.auditoria.encerrar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Executa um standby do Mediclass acompanhando o log de replicação.")
+    parser.add_argument('--wal', default=WAL_DIR, help="diretório compartilhado com o log do primário")
+    parser.add_argument('--replicar', help="diretório de log para replicar este nó após a promoção")
+    args = parser.parse_args()
+    executar_standby(os.path.abspath(args.wal), args.replicar and os.path.abspath(args.replicar))
@@ -0,0 +1,171 @@
+"""
+MEDICLASS: Sistema de Prontuário Eletrônico e Apoio à Decisão Clínica
+Parte do Trabalho Prático de ELE078
+
+Arquivo: sinais_vitais.py
+Autor: Matheus Marcondes <matheusmarcondes@ufmg.br>
+Data de criação: 2026-10-18
+Descrição:
+    Módulo responsável pela classe MonitorSinaisVitais, que guarda séries temporais de sinais
+    vitais por paciente em buffers circulares compactos (bytearray/array) e calcula, em uma única
+    passada sobre as colunas da enfermaria, um escore de alerta precoce (estilo NEWS) construído
+    sobre as faixas usadas em Enfermeiro.triagem.
+Repositório:
+Licença: MIT License
+Dependências:
+    array, threading, time
+"""
+
+import threading
+import time
+from array import array
+
+CAPACIDADE_SERIE = 32           # leituras mantidas por paciente (buffer circular)
+LIMIAR_PRIORIDADE = 3           # escore a partir do qual o paciente passa a prioritário
+LIMIAR_PIORA = 2                # aumento de escore entre as duas últimas leituras que caracteriza piora
+INTERVALO_REAVALIACAO = 300     # segundos entre reavaliações da enfermaria
+
+
+def _tabela(faixas: list[tuple[int, int, int]]) -> bytes:
+    # tabela de 256 posições: valor do sinal vital -> pontos; faixas = (minimo, maximo, pontos)
+    tabela = bytearray(256)
+    for minimo, maximo, pontos in faixas:
+        for v in range(max(minimo, 0), min(maximo, 255) + 1):
+            tabela[v] = pontos
+    return bytes(tabela)
+
+
+# pontuação por faixa: 0 pontos exatamente nas faixas consideradas normais na triagem
+# (FC 70-120, PAS 90-140, PAD 60-90, SpO2 >= 95), crescendo conforme se afasta delas
+PONTOS_FC = _tabela([(0, 49, 3), (50, 59, 2), (60, 69, 1), (121, 130, 1), (131, 140, 2), (141, 255, 3)])
+PONTOS_PAS = _tabela([(0, 69, 3), (70, 79, 2), (80, 89, 1), (141, 160, 1), (161, 180, 2), (181, 255, 3)])
+PONTOS_PAD = _tabela([(0, 39, 3), (40, 49, 2), (50, 59, 1), (91, 100, 1), (101, 110, 2), (111, 255, 3)])
+PONTOS_SPO2 = _tabela([(0, 90, 3), (91, 92, 2), (93, 94, 1)])
+
+
+class MonitorSinaisVitais:        # séries de sinais vitais de todos os pacientes, em colunas contíguas indexadas por "slot"
+
+    def __init__(self, capacidade: int = CAPACIDADE_SERIE):
+        self.capacidade = capacidade
+        self._slot: dict[str, int] = {}     # CPF -> slot
+        self._cpfs: list[str] = []          # slot -> CPF
+        # buffers circulares: leitura k do slot s fica na posição s * capacidade + k
+        self._fc = bytearray()
+        self._pas = bytearray()
+        self._pad = bytearray()
+        self._spo2 = bytearray()
+        self._instante = array('d')
+        self._proxima = array('H')          # próxima posição de escrita de cada slot
+        self._quantidade = array('H')       # leituras válidas de cada slot
+        # colunas da última leitura de cada slot (entrada da passada vetorizada)
+        self._ultimo_fc = bytearray()
+        self._ultimo_pas = bytearray()
+        self._ultimo_pad = bytearray()
+        self._ultimo_spo2 = bytearray()
+        # colunas da leitura anterior à última (base da tendência)
+        self._anterior_fc = bytearray()
+        self._anterior_pas = bytearray()
+        self._anterior_pad = bytearray()
+        self._anterior_spo2 = bytearray()
+        self._escore = bytearray()          # escore da última avaliação
+        self._lock = threading.Lock()
+
+    def _novo_slot(self, cpf: str) -> int:
+        slot = len(self._cpfs)
+        self._slot[cpf] = slot
+        self._cpfs.append(cpf)
+        vazio = bytes(self.capacidade)
+        for buf in (self._fc, self._pas, self._pad, self._spo2):
+            buf.extend(vazio)
+        self._instante.extend([0.0] * self.capacidade)
+        self._proxima.append(0)
+        self._quantidade.append(0)
+        for col in (self._ultimo_fc, self._ultimo_pas, self._ultimo_pad, self._ultimo_spo2,
+                    self._anterior_fc, self._anterior_pas, self._anterior_pad, self._anterior_spo2, self._escore):
+            col.append(0)
+        return slot
+
+    def registrar(self, cpf: str, fc: int, pas: int, pad: int, spo2: int, instante: float | None = None) -> None:
+        with self._lock:
+            slot = self._slot.get(cpf)
+            if slot is None:
+                slot = self._novo_slot(cpf)
+            pos = slot * self.capacidade + self._proxima[slot]
+            self._anterior_fc[slot] = self._ultimo_fc[slot]
+            self._anterior_pas[slot] = self._ultimo_pas[slot]
+            self._anterior_pad[slot] = self._ultimo_pad[slot]
+            self._anterior_spo2[slot] = self._ultimo_spo2[slot]
+            self._fc[pos] = self._ultimo_fc[slot] = min(int(fc), 255)
+            self._pas[pos] = self._ultimo_pas[slot] = min(int(pas), 255)
+            self._pad[pos] = self._ultimo_pad[slot] = min(int(pad), 255)
+            self._spo2[pos] = self._ultimo_spo2[slot] = min(int(spo2), 255)
+            self._instante[pos] = instante if instante is not None else time.time()
+            self._proxima[slot] = (self._proxima[slot] + 1) % self.capacidade
+            self._quantidade[slot] = min(self._quantidade[slot] + 1, self.capacidade)
+
+    def registrar_anamnese(self, cpf: str, anamnese) -> None:        # extrai os sinais vitais de uma Anamnese ("PAS/PAD")
+        pas, _, pad = str(anamnese.pressao_arterial).partition('/')
+        self.registrar(cpf, anamnese.frequencia_cardiaca, int(pas), int(pad), int(anamnese.saturacao_o2),
+                       anamnese.timestamp.timestamp())
+
+    def serie(self, cpf: str) -> list[dict]:        # leituras do paciente, da mais antiga para a mais recente
+        with self._lock:
+            slot = self._slot.get(cpf)
+            if slot is None:
+                return []
+            n = self._quantidade[slot]
+            base = slot * self.capacidade
+            inicio = (self._proxima[slot] - n) % self.capacidade
+            leituras = []
+            for k in range(n):
+                pos = base + (inicio + k) % self.capacidade
+                leituras.append({
+                    'instante': self._instante[pos],
+                    'frequencia_cardiaca': self._fc[pos],
+                    'pressao_arterial': f"{self._pas[pos]}/{self._pad[pos]}",
+                    'saturacao_o2': self._spo2[pos],
+                })
+            return leituras
+
+    def escore(self, cpf: str) -> int | None:
+        slot = self._slot.get(cpf)
+        return None if slot is None else self._escore[slot]
+
+    @staticmethod
+    def _escores(fc: bytearray, pas: bytearray, pad: bytearray, spo2: bytearray) -> bytearray:
+        # cada coluna é convertida em pontos por bytes.translate (laço em C) e as quatro são somadas com map/zip
+        pontos = zip(fc.translate(PONTOS_FC), pas.translate(PONTOS_PAS),
+                     pad.translate(PONTOS_PAD), spo2.translate(PONTOS_SPO2))
+        return bytearray(map(sum, pontos))
+
+    def avaliar(self) -> list[tuple[str, int, bool]]:
+        """
+        Recalcula o escore de todos os pacientes em uma passada sobre as colunas de últimas leituras.
+        A piora é a tendência registrada no buffer: escore da última leitura contra o da anterior,
+        e só existe para séries com ao menos duas leituras. Retorna (cpf, escore, piora).
+        """
+        with self._lock:
+            novos = self._escores(self._ultimo_fc, self._ultimo_pas, self._ultimo_pad, self._ultimo_spo2)
+            anteriores = self._escores(self._anterior_fc, self._anterior_pas, self._anterior_pad, self._anterior_spo2)
+            self._escore = novos
+            return [
+                (cpf, novo, n >= 2 and novo - antigo >= LIMIAR_PIORA)
+                for cpf, novo, antigo, n in zip(self._cpfs, novos, anteriores, self._quantidade)
+            ]
+
+
+class ReavaliacaoPeriodica(threading.Thread):        # executa a reavaliação de prioridades da enfermaria em intervalos fixos
+
+    def __init__(self, tarefa, intervalo: float = INTERVALO_REAVALIACAO):
+        super().__init__(name='reavaliacao-escores', daemon=True)
+        self.tarefa = tarefa
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+
+    def run(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            self.tarefa()
+
+    def parar(self) -> None:
+        self._parar.set()
+        self.join()
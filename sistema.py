@@ -9,25 +9,84 @@ Descrição:
     Módulo principal com a classe SistemaMediclass,
     responsável pela interface via prompt e fluxos de login, cadastro, triagem,
     diagnóstico, visualização, exportação de prontuário em TXT e adição de exames por técnico,
-    mantendo dados em memória.
+    mantendo dados em memória e estatísticas agregadas atualizadas a cada evento.
+    A alocação de leitos é feita pelo RegistroLeitos (alas configuradas em leitos.json) e as
+    prioridades são reavaliadas pelo escore de alerta precoce do MonitorSinaisVitais.
+    Todo acesso a prontuário é registrado na TrilhaAuditoria e novos cadastros são comparados
+    ao índice de duplicados. Com a replicação ativa, cada mutação é enviada aos standbys (replicar).
 Repositório: 
 Licença: MIT License
 Dependências:
-    sys, datetime, profissionais, paciente
+    os, sys, datetime, profissionais, paciente, estatisticas, leitos, sinais_vitais, auditoria, cache, duplicados,
+    passagem_plantao, ingestao_exames, exportacao_analitica
 """
 
+import os
 import sys
 from datetime import date
 
 from profissionais import Medico, Enfermeiro, Tecnico, Profissional
 from paciente import Paciente
+from estatisticas import EstatisticasMediclass
+from leitos import RegistroLeitos
+from sinais_vitais import MonitorSinaisVitais, LIMIAR_PRIORIDADE
+from auditoria import TrilhaAuditoria
+from cache import cache_prontuarios
+from duplicados import IndiceDuplicados, mesclar_historicos
+from passagem_plantao import gerar_relatorio, JANELA_PADRAO_HORAS
+from ingestao_exames import processar_entrada, ENTRADA_DIR, REJEITADOS_FILE
+from exportacao_analitica import exportar, EXPORTACAO_DIR, FORMATOS
+
+def renderizar_prontuario(paciente: Paciente) -> str:        # texto do prontuário exportado em .txt, servido do cache quando possível
+    historico = paciente.consultar_historico()
+    anamnese = getattr(paciente, 'ultima_anamnese', None)
+    # assinatura dos campos exibidos: qualquer alteração gera uma nova renderização
+    assinatura = (paciente.nome, paciente.contato, paciente.convenio, paciente.leito,
+                  paciente.enfermeiro_triagem, paciente.prioritario, anamnese and anamnese.timestamp, len(historico))
+    chave = ('prontuario', paciente.cpf)
+    em_cache = cache_prontuarios.obter(chave)
+    if em_cache is not None and em_cache[0] == assinatura:
+        return em_cache[1]
+
+    conteudo = [
+        f"Prontuário de {paciente.nome}",
+        f"CPF: {paciente.cpf}",
+        f"Contato: {paciente.contato}",
+        f"Convênio: {paciente.convenio}",
+        f"Data de nascimento: {paciente.data_nascimento.isoformat()}",
+        f"Leito: {paciente.leito}",
+        f"Enfermeiro: {paciente.enfermeiro_triagem}",
+        f"Prioritário: {'Sim' if paciente.prioritario else 'Não'}",
+        "\nHistórico Médico:",
+        historico
+    ]
+
+    if anamnese:    # coloca informações da ultima anamnese (se existente) no arquivo
+        conteudo.append("\nÚltima Anamnese:")
+        for k, v in anamnese.to_dict().items():
+            conteudo.append(f"{k}: {v}")
+    texto = "\n".join(conteudo)
+    cache_prontuarios.guardar(chave, (assinatura, texto))
+    return texto
+
 
 class SistemaMediclass:
     def __init__(self):
         # armazenamento em memória de Profissionais (usuarios) e pacientes
         self.usuarios: dict[str, Profissional] = {}
         self.pacientes: dict[str, Paciente] = {}
+        self.fabrica_paciente = Paciente                 # substituída no modo fragmentado (pacientes criados nos processos trabalhadores)
+        self.estatisticas = EstatisticasMediclass()      # contadores do censo, atualizados em O(1) por evento
+        self.leitos = RegistroLeitos()                   # vazio = leito como texto livre (sem leitos.json)
+        self.vitais = MonitorSinaisVitais()              # séries de sinais vitais para o escore de alerta precoce
+        self.auditoria = TrilhaAuditoria()               # registro de acessos, gravado em lotes por thread própria
+        self.duplicados = IndiceDuplicados()             # blocagem por nome/data de nascimento para detectar cadastros duplicados
+        self.replicacao = None                           # PublicadorReplicacao do primário (python main.py --replicar DIR)
         
+    def replicar(self, paciente: Paciente) -> None:        # envia o estado atual do paciente aos standbys (sem efeito sem replicação)
+        if self.replicacao is not None:
+            self.replicacao.publicar_paciente(paciente)
+
     # adiciona usuario
     def registrar_usuario(self, usuario: Profissional) -> None:
         self.usuarios[usuario.login] = usuario
@@ -52,6 +111,14 @@ class SistemaMediclass:
             print("4. Visualizar prontuário")
             print("5. Exportar prontuário (.txt)")
             print("6. Adicionar exame (técnico)")
+            print("7. Painel de estatísticas (censo)")
+            print("8. Gerenciar leitos (transferência/alta)")
+            print("9. Cadastros duplicados (verificar/mesclar)")
+            print("10. Relatório de passagem de plantão")
+            print("11. Importar resultados do laboratório (técnico)")
+            print("12. Exportar dataset analítico")
+            print("13. Buscar paciente por nome")
+            print("14. Exportar todos os prontuários (.txt)")
             print("0. Logout")
             escolha = input("Escolha uma opção: ")
             if escolha == '0':
@@ -69,13 +136,30 @@ class SistemaMediclass:
                 self.op_exportar_prontuario(usuario)
             elif escolha == '6':
                 self.op_adicionar_exame(usuario)
+            elif escolha == '7':
+                self.op_painel_estatisticas(usuario)
+            elif escolha == '8':
+                self.op_gerenciar_leitos(usuario)
+            elif escolha == '9':
+                self.op_duplicados(usuario)
+            elif escolha == '10':
+                self.op_passagem_plantao(usuario)
+            elif escolha == '11':
+                self.op_importar_laboratorio(usuario)
+            elif escolha == '12':
+                self.op_exportar_dataset(usuario)
+            elif escolha == '13':
+                self.op_buscar_paciente(usuario)
+            elif escolha == '14':
+                self.op_exportar_todos(usuario)
             else:
                 print("Opção inválida.")
 
     def op_registrar_entrada(self, usuario: Profissional) -> None:
         cpf = input("CPF do paciente: ")
         paciente = self.pacientes.get(cpf)
-        if not paciente:
+        novo = not paciente
+        if novo:
             print("Paciente não encontrado. Cadastrando novo.")
             nome = input("Nome completo: ")
             contato = input("Contato: ")
@@ -87,9 +171,13 @@ class SistemaMediclass:
                     break
                 except ValueError:
                     print("Formato inválido. Use YYYY-MM-DD.")
-            leito = input("Leito: ")
+            existente = self._verificar_duplicado(nome, data_nasc)    # CPF digitado errado? oferece o cadastro existente
+            if existente:
+                paciente, cpf, novo = existente, existente.cpf, False
+        if novo:
+            leito = self._escolher_leito(cpf)
             enfermeiro = usuario.nome if isinstance(usuario, Enfermeiro) else ''
-            paciente = Paciente(
+            paciente = self.fabrica_paciente(
                 nome=nome,
                 cpf=cpf,
                 contato=contato,
@@ -100,12 +188,52 @@ class SistemaMediclass:
             )
             paciente.ultima_anamnese = None
             self.pacientes[cpf] = paciente
+            self.duplicados.adicionar(paciente)
+            self.replicar(paciente)                      # cadastro chega aos standbys antes dos registros do histórico
+            self.auditoria.registrar(usuario, cpf, 'cadastro')
         else:
             if not hasattr(paciente, 'ultima_anamnese'):
                 paciente.ultima_anamnese = None
+            if self.leitos.configurado and not self.leitos.leito_de(cpf):    # reinternação após alta: aloca novo leito
+                paciente.leito = self._escolher_leito(cpf)
         paciente.registrar_entrada()
+        self.auditoria.registrar(usuario, cpf, 'entrada')
+        self.estatisticas.registrar_entrada(cpf)
+        self.replicar(paciente)
         print("Entrada registrada.")
 
+    def _verificar_duplicado(self, nome: str, data_nasc: date) -> Paciente | None:
+        candidatos = self.duplicados.candidatos(nome, data_nasc)
+        if not candidatos:
+            return None
+        print("Atenção: possível cadastro duplicado (mesmo nascimento, nome semelhante):")
+        for cpf, pontuacao in candidatos[:5]:
+            print(f"CPF {cpf} - {self.pacientes.get(cpf).nome} (similaridade {pontuacao:.0%})")
+        escolha = input("CPF do cadastro existente a usar (Enter para cadastrar novo): ").strip()
+        if escolha in dict(candidatos):
+            return self.pacientes.get(escolha)
+        return None
+
+    def _escolher_leito(self, cpf: str) -> str:
+        if not self.leitos.configurado:
+            return input("Leito: ")
+        for ala, info in self.leitos.resumo().items():             # resumo por ala, sem percorrer pacientes
+            print(f"Ala {ala}: {info['livres']} livre(s) de {info['capacidade']}")
+        while True:
+            entrada = input("Ala ou leito (ex.: A ou A-03, 0 para aguardar leito): ").strip()
+            if entrada == '0':
+                return ''
+            if entrada in self.leitos.capacidade:
+                leito = self.leitos.alocar(cpf, entrada)
+                if leito:
+                    print(f"Leito {leito} alocado.")
+                    return leito
+                print("Ala lotada. Escolha outra ala.")
+            elif self.leitos.ocupar(cpf, entrada):
+                return self.leitos.leito_de(cpf)
+            else:
+                print("Leito inexistente ou ocupado.")
+
 
     def op_triagem(self, usuario: Profissional) -> None:
         if not isinstance(usuario, Enfermeiro):        # controla acesso ao método triagem para Enf
@@ -117,6 +245,12 @@ class SistemaMediclass:
             print("Paciente não encontrado.")
             return
         usuario.triagem(paciente)                      # conduz triagem e retorna ao menu
+        self.auditoria.registrar(usuario, cpf, 'triagem')
+        self.estatisticas.registrar_triagem(paciente.ultima_anamnese.tipo_sintoma.value)
+        self.vitais.registrar_anamnese(cpf, paciente.ultima_anamnese)
+        if paciente.prioritario:
+            self.estatisticas.registrar_prioridade(cpf)
+        self.replicar(paciente)
         print("Triagem concluída.")
 
     def op_diagnostico(self, usuario: Profissional) -> None:
@@ -128,7 +262,11 @@ class SistemaMediclass:
         if not paciente:
             print("Paciente não encontrado.")
             return
+        n_anteriores = len(paciente.diagnosticos_sugeridos)
+        self.auditoria.registrar(usuario, cpf, 'consulta')
         sugestoes = usuario.sugerir_diagnosticos(paciente)
+        for diag in paciente.diagnosticos_sugeridos[n_anteriores:]:    # contabiliza apenas as sugestões desta consulta
+            self.estatisticas.registrar_diagnostico(diag.categoria)
         if not sugestoes:                             # caso Diagnostico nulo/inconclusivo
             print("Nenhum diagnóstico sugerido.")
             return
@@ -143,6 +281,7 @@ class SistemaMediclass:
             
         if input("Deseja gerar receituário? (S/N): ").strip().upper() == 'S':
             usuario.gerar_receituario(paciente)
+            self.replicar(paciente)
             
         if input("Deseja gerar declaração de comparecimento? (S/N): ").strip().upper() == 'S':
             usuario.gerar_declaracao_comparecimento(paciente)
@@ -158,6 +297,8 @@ class SistemaMediclass:
             print("Paciente não encontrado.")
             return
 
+        self.auditoria.registrar(usuario, cpf, 'visualizacao')
+
         # imprime informações do prontuario no prompt
         print(f"\n=== Prontuário de {paciente.nome} ===")
         print(f"CPF: {paciente.cpf}")
@@ -175,6 +316,11 @@ class SistemaMediclass:
                 print(f"{k}: {v}")
         else:
             print("Nenhuma anamnese disponível.")
+        serie = self.vitais.serie(cpf)
+        if serie:                                                                # tendência dos sinais vitais
+            print(f"\n--- Sinais vitais (escore de alerta: {self.vitais.escore(cpf)}) ---")
+            for leitura in serie[-5:]:
+                print(f"FC {leitura['frequencia_cardiaca']} | PA {leitura['pressao_arterial']} | SpO2 {leitura['saturacao_o2']}%")
 
     def op_exportar_prontuario(self, usuario: Profissional) -> None:
         cpf = input("CPF do paciente para exportação: ")                        # busca paciente pelo cpf
@@ -185,27 +331,40 @@ class SistemaMediclass:
 
         # cria arquivo para exportacao com dados registrados
         filename = f"prontuario_{paciente.cpf}.txt"
-        conteudo = [
-            f"Prontuário de {paciente.nome}",
-            f"CPF: {paciente.cpf}",
-            f"Contato: {paciente.contato}",
-            f"Convênio: {paciente.convenio}",
-            f"Data de nascimento: {paciente.data_nascimento.isoformat()}",
-            f"Leito: {paciente.leito}",
-            f"Enfermeiro: {paciente.enfermeiro_triagem}",
-            f"Prioritário: {'Sim' if paciente.prioritario else 'Não'}",
-            "\nHistórico Médico:",
-            paciente.consultar_historico()
-        ]
-
-        if hasattr(paciente, 'ultima_anamnese') and paciente.ultima_anamnese:    # coloca informações da ultima anamnese (se existente) no arquivo
-            conteudo.append("\nÚltima Anamnese:")
-            for k, v in paciente.ultima_anamnese.to_dict().items():
-                conteudo.append(f"{k}: {v}")
+        self.auditoria.registrar(usuario, cpf, 'exportacao')
         with open(filename, 'w', encoding='utf-8') as f:
-            f.write("\n".join(conteudo))
+            f.write(renderizar_prontuario(paciente))
         print(f"Prontuário exportado para {filename}")
 
+    def op_buscar_paciente(self, usuario: Profissional) -> None:
+        termo = input("Nome (ou parte do nome): ").strip().casefold()
+        if not termo:
+            return
+        roteador = getattr(self.pacientes, 'roteador', None)
+        if roteador:                                                            # modo fragmentado: busca em paralelo em todos os fragmentos
+            encontrados = roteador.buscar(termo)
+        else:
+            encontrados = sorted(((p.cpf, p.nome, p.leito) for p in self.pacientes.values() if termo in p.nome.casefold()),
+                                 key=lambda r: r[1])
+        for cpf, nome, leito in encontrados[:50]:
+            print(f"CPF {cpf} - {nome} | Leito {leito or '-'}")
+        print(f"{len(encontrados)} paciente(s) encontrado(s).")
+
+    def op_exportar_todos(self, usuario: Profissional) -> None:
+        diretorio = input("Diretório de destino (Enter = prontuarios): ").strip() or 'prontuarios'
+        roteador = getattr(self.pacientes, 'roteador', None)
+        if roteador:                                                            # cada fragmento renderiza os seus prontuários
+            total = roteador.exportar_todos(diretorio)
+        else:
+            os.makedirs(diretorio, exist_ok=True)
+            total = 0
+            for paciente in self.pacientes.values():
+                with open(os.path.join(diretorio, f"prontuario_{paciente.cpf}.txt"), 'w', encoding='utf-8') as f:
+                    f.write(renderizar_prontuario(paciente))
+                total += 1
+        self.auditoria.registrar(usuario, '*', 'exportacao_todos')
+        print(f"{total} prontuário(s) exportado(s) para {diretorio}/")
+
     def op_adicionar_exame(self, usuario: Profissional) -> None:
         
         if not isinstance(usuario, Tecnico):        # controla acesso ao método para Tec
@@ -217,7 +376,175 @@ class SistemaMediclass:
         if not paciente:
             print("Paciente não encontrado.")
             return
+        n_anteriores = len(paciente.resultados_exames)
         usuario.adicionar_exame_sistema(paciente)
+        self.auditoria.registrar(usuario, cpf, 'exame')
+        for resultado in paciente.resultados_exames[n_anteriores:]:
+            self.estatisticas.registrar_exame(resultado['exame'])
+        self.replicar(paciente)
+
+    def op_painel_estatisticas(self, usuario: Profissional) -> None:
+        print()
+        print(self.estatisticas.painel(self.leitos))     # leitura direta dos contadores, sem percorrer pacientes
+        roteador = getattr(self.pacientes, 'roteador', None)
+        if roteador:
+            c = roteador.censo()
+            print(f"\n--- Fragmentos ({roteador.n}) ---\n{c['pacientes']} pacientes, "
+                  f"{c['internados']} com leito, {c['prioritarios']} prioritários")
+        c = cache_prontuarios.estatisticas()
+        print(f"\n--- Cache de prontuários ---\n{c['itens']} itens, {c['bytes_usados'] // 1024} KiB | "
+              f"acertos {c['acertos']}, falhas {c['falhas']}, remoções {c['remocoes']} ({c['taxa_acerto']:.0%})")
+        if self.leitos.configurado:
+            print("\n--- Leitos por ala ---")
+            for ala, info in self.leitos.resumo().items():
+                print(f"{ala}: {info['ocupados']}/{info['capacidade']} ocupados  [{self.leitos.mapa(ala)}]")
+
+    def op_gerenciar_leitos(self, usuario: Profissional) -> None:
+        if not self.leitos.configurado:
+            print("Nenhuma ala configurada (leitos.json).")
+            return
+        print("1. Transferir paciente\n2. Alta (liberar leito)\n3. Listar leitos livres")
+        escolha = input("Opção: ")
+        if escolha == '3':
+            for ala in self.leitos.capacidade:
+                print(f"{ala}: {', '.join(self.leitos.leitos_livres(ala)) or '(lotada)'}")
+            return
+        cpf = input("CPF do paciente: ")
+        paciente = self.pacientes.get(cpf)
+        if not paciente:
+            print("Paciente não encontrado.")
+            return
+        anterior = self.leitos.leito_de(cpf)
+        if escolha == '1':
+            destino = input("Ala ou leito de destino: ").strip()
+            novo = self.leitos.transferir(cpf, destino)
+            if not novo:
+                print("Destino inexistente, ocupado ou ala lotada.")
+                return
+            paciente.leito = novo
+            self.auditoria.registrar(usuario, cpf, 'transferencia')
+            paciente.atualizar_historico(f"Transferência do leito {anterior or '-'} para {novo}")
+            self.replicar(paciente)
+            print(f"Paciente transferido para o leito {novo}.")
+        elif escolha == '2':
+            if not anterior:
+                print("Paciente não ocupa leito.")
+                return
+            self.leitos.liberar(cpf)
+            self.estatisticas.registrar_alta(cpf)
+            paciente.leito = ''
+            self.auditoria.registrar(usuario, cpf, 'alta')
+            paciente.atualizar_historico(f"Alta: leito {anterior} liberado")
+            self.replicar(paciente)
+            print(f"Leito {anterior} liberado.")
+        else:
+            print("Opção inválida.")
+
+    def op_duplicados(self, usuario: Profissional) -> None:
+        pares = self.duplicados.varrer()                 # compara apenas pacientes do mesmo bloco
+        if not pares:
+            print("Nenhum possível cadastro duplicado encontrado.")
+            return
+        print("--- Possíveis cadastros duplicados ---")
+        for a, b, pontuacao in pares:
+            print(f"{a} - {self.pacientes.get(a).nome}  x  {b} - {self.pacientes.get(b).nome} ({pontuacao:.0%})")
+        if input("Deseja mesclar um par? (S/N): ").strip().upper() != 'S':
+            return
+        principal = input("CPF a manter: ").strip()
+        duplicado = input("CPF duplicado (será removido): ").strip()
+        if principal == duplicado or principal not in self.pacientes or duplicado not in self.pacientes:
+            print("CPFs inválidos.")
+            return
+        if self.mesclar_pacientes(principal, duplicado):
+            self.auditoria.registrar(usuario, principal, f'mesclagem:{duplicado}')
+            print(f"Cadastro {duplicado} mesclado em {principal}.")
+
+    def op_passagem_plantao(self, usuario: Profissional) -> None:
+        entrada = input(f"Janela do plantão em horas (Enter = {JANELA_PADRAO_HORAS}): ").strip()
+        try:
+            horas = float(entrada) if entrada else JANELA_PADRAO_HORAS
+        except ValueError:
+            print("Valor inválido.")
+            return
+        destino, total = gerar_relatorio(self.pacientes, horas)
+        self.auditoria.registrar(usuario, '*', 'passagem_plantao')
+        print(f"Relatório de passagem de plantão com {total} paciente(s) exportado para {destino}")
+
+    def mesclar_pacientes(self, cpf_principal: str, cpf_duplicado: str) -> bool:
+        principal = self.pacientes.get(cpf_principal)
+        duplicado = self.pacientes.get(cpf_duplicado)
+        if not hasattr(principal, '_historico_file'):
+            print("Mesclagem indisponível no modo fragmentado.")
+            return False
+        mesclar_historicos(principal, duplicado)
+        principal.resultados_exames.extend(duplicado.resultados_exames)
+        principal.prescricoes.extend(duplicado.prescricoes)
+        principal.diagnosticos_sugeridos.extend(duplicado.diagnosticos_sugeridos)
+        if duplicado.prioritario and not principal.prioritario:
+            principal.prioritario = True
+            self.estatisticas.registrar_prioridade(cpf_principal)
+        if not getattr(principal, 'ultima_anamnese', None):
+            principal.ultima_anamnese = getattr(duplicado, 'ultima_anamnese', None)
+        leito = self.leitos.liberar(cpf_duplicado)
+        if leito and not self.leitos.leito_de(cpf_principal):
+            principal.leito = self.leitos.transferir(cpf_principal, leito) or principal.leito
+        self.estatisticas.registrar_alta(cpf_duplicado)
+        self.duplicados.remover(cpf_duplicado)
+        del self.pacientes[cpf_duplicado]
+        self.replicar(principal)
+        if self.replicacao is not None:                  # histórico do principal foi reescrito fora de atualizar_historico
+            self.replicacao.publicar_historico(principal)
+            self.replicacao.publicar_remocao(cpf_duplicado)
+        return True
+
+    def reavaliar_prioridades(self) -> int:
+        """
+        Recalcula o escore de alerta precoce de toda a enfermaria e atualiza a flag de prioridade:
+        ativa por escore alto ou piora entre as duas últimas leituras, desativa quando o escore volta a zero.
+        Retorna o número de pacientes cuja prioridade mudou.
+        """
+        alteracoes = 0
+        for cpf, escore, piora in self.vitais.avaliar():
+            paciente = self.pacientes.get(cpf)
+            if not paciente:
+                continue
+            if (escore >= LIMIAR_PRIORIDADE or piora) and not paciente.prioritario:
+                paciente.prioritario = True
+                motivo = "piora dos sinais vitais" if piora else "escore elevado"
+                paciente.atualizar_historico(f"FLAG: Prioridade ativada por {motivo} (escore de alerta {escore}).")
+                self.estatisticas.registrar_prioridade(cpf)
+                self.replicar(paciente)
+                alteracoes += 1
+            elif escore == 0 and paciente.prioritario:
+                paciente.prioritario = False
+                paciente.atualizar_historico("FLAG: Prioridade desativada, sinais vitais normalizados.")
+                self.estatisticas.registrar_prioridade(cpf, ativa=False)
+                self.replicar(paciente)
+                alteracoes += 1
+        return alteracoes
+
+    def op_importar_laboratorio(self, usuario: Profissional) -> None:
+        if not isinstance(usuario, Tecnico):        # controla acesso ao método para Tec
+            print("Acesso negado. Apenas técnicos podem importar exames.")
+            return
+        totais = processar_entrada(self, usuario)
+        print(f"{totais['arquivos']} arquivo(s) de {ENTRADA_DIR} processado(s): "
+              f"{totais['aceitos']} resultado(s) adicionados, {totais['rejeitados']} rejeitado(s)"
+              + (f" (ver {REJEITADOS_FILE})" if totais['rejeitados'] else "") + ".")
+
+    def op_exportar_dataset(self, usuario: Profissional) -> None:
+        formato = input(f"Formato ({'/'.join(FORMATOS)}, Enter = csv): ").strip().lower() or 'csv'
+        if formato not in FORMATOS:
+            print("Formato inválido.")
+            return
+        completa = input("Exportação completa? (S/N, N = apenas alterações desde a última): ").strip().upper() == 'S'
+        try:
+            totais = exportar(self.pacientes, formato=formato, incremental=not completa)
+        except RuntimeError as erro:
+            print(erro)
+            return
+        self.auditoria.registrar(usuario, '*', 'exportacao_analitica')
+        print(f"Dataset exportado em {EXPORTACAO_DIR}/: " + ", ".join(f"{t} {n}" for t, n in totais.items()))
 
     def executar(self) -> None:
         """
@@ -235,4 +562,6 @@ if __name__ == "__main__":
     sistema.registrar_usuario(Medico("Dr. Teste", "CRM123", "med", "senha"))
     sistema.registrar_usuario(Enfermeiro("Enf. Teste", "COREN456", "enf", "senha"))
     sistema.registrar_usuario(Tecnico("Tec. Teste", "CRTR789", "tec", "senha"))
+    sistema.auditoria.iniciar()
     sistema.executar()
+    sistema.auditoria.encerrar()